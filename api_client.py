@@ -1,14 +1,83 @@
 import requests
-import json
-from typing import Dict, Any, Optional, List
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+import asyncio
+import functools
+import importlib.util
+import math
+import random
 import time
 import os
 
+from json_codec import codec
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+TRANSPORT_ERRORS: Tuple[type, ...] = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+REQUEST_ERRORS: Tuple[type, ...] = (requests.exceptions.RequestException,)
+if httpx is not None:
+    TRANSPORT_ERRORS += (httpx.TransportError,)
+    REQUEST_ERRORS += (httpx.HTTPError,)
+if aiohttp is not None:
+    TRANSPORT_ERRORS += (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+    REQUEST_ERRORS += (aiohttp.ClientError,)
+
+class RetryPolicy:
+    def __init__(self, max_retries: int = 3, backoff_factor: float = 0.5, backoff_max: float = 30.0,
+                 statuses: Tuple[int, ...] = (429, 500, 502, 503, 504),
+                 methods: Tuple[str, ...] = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.statuses = set(statuses)
+        self.methods = set(methods)
+    
+    def should_retry(self, method: str, attempt: int, status: Optional[int] = None) -> bool:
+        if attempt >= self.max_retries or method.upper() not in self.methods:
+            return False
+        return status is None or status in self.statuses
+    
+    def delay(self, attempt: int, headers: Optional[Dict[str, str]] = None) -> Optional[float]:
+        retry_after = (headers or {}).get('Retry-After')
+        if retry_after:
+            # Honour the server's hint; None means it asks for longer than backoff_max, so the
+            # caller should give up rather than retry before the server is ready.
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                try:
+                    wait = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    wait = None
+            if wait is not None and not math.isnan(wait):
+                return max(wait, 0.0) if wait <= self.backoff_max else None
+        # "Full jitter": spreads retries from many clients instead of synchronising them.
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
 class APIClient:
-    def __init__(self, base_url: str, api_key: Optional[str] = None):
+    def __init__(self, base_url: str, api_key: Optional[str] = None, pool_connections: int = 10,
+                 pool_maxsize: int = 10, retry: Optional[RetryPolicy] = None, timeout: float = 30.0,
+                 http2: bool = False):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.timeout = timeout
         self.session = requests.Session()
+        # Keep-alive connections are pooled per host; pool_maxsize should cover the number of
+        # threads sharing this client, otherwise extra connections are opened and thrown away.
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
         if api_key:
             self.session.headers.update({
@@ -19,50 +88,244 @@ class APIClient:
             self.session.headers.update({
                 'Content-Type': 'application/json'
             })
+        
+        self.http2 = None
+        if http2:
+            if httpx is None or importlib.util.find_spec('h2') is None:
+                print("HTTP/2 needs httpx with the h2 extra (pip install 'httpx[http2]'); using HTTP/1.1")
+            else:
+                limits = httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+                self.http2 = httpx.Client(http2=True, limits=limits, headers=dict(self.session.headers))
+    
+    def _send(self, method: str, url: str, **kwargs):
+        if self.http2 is not None:
+            if 'data' in kwargs:
+                kwargs['content'] = kwargs.pop('data')
+            return self.http2.request(method, url, timeout=self.timeout, **kwargs)
+        return self.session.request(method, url, timeout=self.timeout, **kwargs)
     
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict[str, Any]]:
+    def _make_request(self, method: str, endpoint: str, retry: Optional[RetryPolicy] = None,
+                      **kwargs) -> Optional[Dict[str, Any]]:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        retry = retry if retry is not None else self.retry
+        attempt = 0
         
-        try:
-            response = self.session.request(method, url, **kwargs)
-            response.raise_for_status()
-            
-            if response.content:
-                return response.json()
-            return {"status": "success"}
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Request failed: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"Response: {e.response.text}")
-            return None
+        while True:
+            try:
+                response = self._send(method, url, **kwargs)
+                if retry.should_retry(method, attempt, response.status_code):
+                    wait_time = retry.delay(attempt, response.headers)
+                    if wait_time is not None:
+                        print(f"{method} {url} returned {response.status_code}, "
+                              f"retrying in {wait_time:.2f} seconds...")
+                        time.sleep(wait_time)
+                        attempt += 1
+                        continue
+                    print(f"{method} {url} asked to retry after more than {retry.backoff_max:.0f} seconds")
+                response.raise_for_status()
+                
+                if response.content:
+                    return codec.loads(response.content)
+                return {"status": "success"}
+                
+            except TRANSPORT_ERRORS as e:
+                if not retry.should_retry(method, attempt):
+                    print(f"Request failed: {e}")
+                    return None
+                wait_time = retry.delay(attempt)
+                print(f"{method} {url} failed ({e}), retrying in {wait_time:.2f} seconds...")
+                time.sleep(wait_time)
+                attempt += 1
+            except REQUEST_ERRORS as e:
+                print(f"Request failed: {e}")
+                if hasattr(e, 'response') and e.response is not None:
+                    print(f"Response: {e.response.text}")
+                return None
+            except ValueError as e:
+                print(f"Invalid JSON response: {e}")
+                return None
+    
+    def _then(self, result: Any, func: Callable[[Any], Any]) -> Any:
+        # Endpoint methods post-process responses through this hook so the same code
+        # works whether the transport returns values or awaitables.
+        return func(result)
+    
+    def close(self):
+        self.session.close()
+        if self.http2 is not None:
+            self.http2.close()
+    
+    @staticmethod
+    def _encode(data: Optional[Dict]) -> Optional[bytes]:
+        return codec.dumpb(data) if data is not None else None
     
     def get(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
         return self._make_request('GET', endpoint, params=params)
     
     def post(self, endpoint: str, data: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
-        return self._make_request('POST', endpoint, json=data)
+        return self._make_request('POST', endpoint, data=self._encode(data))
     
     def put(self, endpoint: str, data: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
-        return self._make_request('PUT', endpoint, json=data)
+        return self._make_request('PUT', endpoint, data=self._encode(data))
     
     def delete(self, endpoint: str) -> Optional[Dict[str, Any]]:
         return self._make_request('DELETE', endpoint)
 
+async def _chain(awaitable: Awaitable, func: Callable[[Any], Any]) -> Any:
+    return func(await awaitable)
+
+def _flight_key(url: str, params: Any) -> Optional[Tuple]:
+    # requests accepts a dict or a sequence of pairs, with list values for repeated keys;
+    # params that cannot be reduced to a hashable form are simply not coalesced.
+    if isinstance(params, (str, bytes)):
+        return (url, params)
+    items = params.items() if isinstance(params, dict) else (params or ())
+    try:
+        normalised = sorted(((str(name), tuple(value) if isinstance(value, (list, tuple)) else value)
+                             for name, value in items), key=lambda item: item[0])
+        key = (url, tuple(normalised))
+        hash(key)
+    except (TypeError, ValueError):
+        return None
+    return key
+
+class AsyncAPIClient(APIClient):
+    def __init__(self, base_url: str, api_key: Optional[str] = None, concurrency: int = 10, **kwargs):
+        kwargs.setdefault('pool_maxsize', concurrency)
+        super().__init__(base_url, api_key, **kwargs)
+        self.concurrency = concurrency
+        self._semaphore = None
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._aiohttp_session = None
+        self._loop = None
+        # asyncio's default executor only has a handful of threads; without aiohttp the
+        # blocking session needs one thread per concurrent request.
+        self._executor = ThreadPoolExecutor(max_workers=concurrency) if aiohttp is None else None
+    
+    async def _send(self, method: str, url: str, **kwargs) -> Tuple[int, Any, bytes]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            if aiohttp is not None:
+                if self._aiohttp_session is None:
+                    connector = aiohttp.TCPConnector(limit=self.concurrency)
+                    self._aiohttp_session = aiohttp.ClientSession(
+                        connector=connector, headers=dict(self.session.headers),
+                        timeout=aiohttp.ClientTimeout(total=self.timeout))
+                if kwargs.get('params') is None:
+                    kwargs.pop('params', None)
+                async with self._aiohttp_session.request(method, url, **kwargs) as response:
+                    return response.status, response.headers, await response.read()
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                self._executor, functools.partial(APIClient._send, self, method, url, **kwargs))
+            return response.status_code, response.headers, response.content
+    
+    async def _request(self, method: str, url: str, retry: RetryPolicy, **kwargs) -> Optional[Dict[str, Any]]:
+        attempt = 0
+        while True:
+            try:
+                status, headers, content = await self._send(method, url, **kwargs)
+            except TRANSPORT_ERRORS as e:
+                if not retry.should_retry(method, attempt):
+                    print(f"Request failed: {e}")
+                    return None
+                wait_time = retry.delay(attempt)
+                print(f"{method} {url} failed ({e}), retrying in {wait_time:.2f} seconds...")
+                await asyncio.sleep(wait_time)
+                attempt += 1
+                continue
+            except REQUEST_ERRORS as e:
+                print(f"Request failed: {e}")
+                return None
+            
+            if retry.should_retry(method, attempt, status):
+                wait_time = retry.delay(attempt, headers)
+                if wait_time is not None:
+                    print(f"{method} {url} returned {status}, retrying in {wait_time:.2f} seconds...")
+                    await asyncio.sleep(wait_time)
+                    attempt += 1
+                    continue
+                print(f"{method} {url} asked to retry after more than {retry.backoff_max:.0f} seconds")
+            if status >= 400:
+                print(f"Request failed: {status} error for url: {url}")
+                print(f"Response: {content.decode('utf-8', 'replace')}")
+                return None
+            
+            try:
+                return codec.loads(content) if content else {"status": "success"}
+            except ValueError as e:
+                print(f"Invalid JSON response: {e}")
+                return None
+    
+    async def _make_request(self, method: str, endpoint: str, retry: Optional[RetryPolicy] = None,
+                            **kwargs) -> Optional[Dict[str, Any]]:
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        retry = retry if retry is not None else self.retry
+        if method.upper() != 'GET':
+            return await self._request(method, url, retry, **kwargs)
+        
+        # Single-flight: identical GETs already on the wire share one request and one result.
+        key = _flight_key(url, kwargs.get('params'))
+        if key is None:
+            return await self._request(method, url, retry, **kwargs)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(method, url, retry, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key, None)
+                                   if self._inflight.get(key) is done else None)
+        return await asyncio.shield(task)
+    
+    def _then(self, result: Any, func: Callable[[Any], Any]) -> Any:
+        return _chain(result, func)
+    
+    async def gather(self, *awaitables: Awaitable) -> List[Any]:
+        return list(await asyncio.gather(*awaitables))
+    
+    def run(self, awaitable: Awaitable) -> Any:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(awaitable)
+    
+    def run_all(self, awaitables) -> List[Any]:
+        return self.run(self.gather(*awaitables))
+    
+    async def aclose(self):
+        if self._aiohttp_session is not None:
+            await self._aiohttp_session.close()
+            self._aiohttp_session = None
+    
+    def close(self):
+        if self._loop is not None:
+            self._loop.run_until_complete(self.aclose())
+            self._loop.close()
+            self._loop = None
+        if self._executor is not None:
+            self._executor.shutdown()
+        super().close()
+    
+    async def __aenter__(self) -> 'AsyncAPIClient':
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+def _list_or_none(response: Any) -> Optional[List[Dict[str, Any]]]:
+    return response if isinstance(response, list) else None
+
 class JSONPlaceholderClient(APIClient):
-    def __init__(self):
-        super().__init__("https://jsonplaceholder.typicode.com")
+    def __init__(self, **kwargs):
+        super().__init__("https://jsonplaceholder.typicode.com", **kwargs)
     
     def get_posts(self) -> Optional[List[Dict[str, Any]]]:
-        response = self.get('/posts')
-        return response if isinstance(response, list) else None
+        return self._then(self.get('/posts'), _list_or_none)
     
     def get_post(self, post_id: int) -> Optional[Dict[str, Any]]:
         return self.get(f'/posts/{post_id}')
     
     def get_comments(self, post_id: int) -> Optional[List[Dict[str, Any]]]:
-        response = self.get(f'/posts/{post_id}/comments')
-        return response if isinstance(response, list) else None
+        return self._then(self.get(f'/posts/{post_id}/comments'), _list_or_none)
     
     def create_post(self, title: str, body: str, user_id: int) -> Optional[Dict[str, Any]]:
         data = {
@@ -85,8 +348,8 @@ class JSONPlaceholderClient(APIClient):
         return self.delete(f'/posts/{post_id}')
 
 class WeatherClient(APIClient):
-    def __init__(self, api_key: str):
-        super().__init__("https://api.openweathermap.org/data/2.5", api_key)
+    def __init__(self, api_key: str, **kwargs):
+        super().__init__("https://api.openweathermap.org/data/2.5", api_key, **kwargs)
     
     def get_current_weather(self, city: str, units: str = 'metric') -> Optional[Dict[str, Any]]:
         params = {
@@ -104,6 +367,12 @@ class WeatherClient(APIClient):
         }
         return self.get('/forecast', params)
 
+class AsyncJSONPlaceholderClient(JSONPlaceholderClient, AsyncAPIClient):
+    pass
+
+class AsyncWeatherClient(WeatherClient, AsyncAPIClient):
+    pass
+
 def demo_jsonplaceholder():
     print("JSONPlaceholder API Demo")
     print("=" * 40)
@@ -164,19 +433,25 @@ def demo_weather():
             print(f"Temperature: {temp}°C")
             print(f"Description: {description}")
 
-def rate_limited_request(client: APIClient, endpoint: str, max_retries: int = 3, delay: float = 1.0):
-    for attempt in range(max_retries):
-        response = client.get(endpoint)
-        if response:
-            return response
-        
-        if attempt < max_retries - 1:
-            wait_time = delay * (2 ** attempt)
-            print(f"Request failed, retrying in {wait_time} seconds...")
-            time.sleep(wait_time)
+def demo_async_comments(post_ids: range = range(1, 101)):
+    print("\nConcurrent Comments Demo")
+    print("=" * 40)
+    
+    client = AsyncJSONPlaceholderClient(concurrency=20)
+    start = time.perf_counter()
+    results = client.run_all(client.get_comments(post_id) for post_id in post_ids)
+    elapsed = time.perf_counter() - start
+    client.close()
     
-    print("Max retries reached")
-    return None
+    comments = sum(len(result) for result in results if result)
+    print(f"Fetched {comments} comments for {len(post_ids)} posts in {elapsed:.2f} seconds")
+
+def rate_limited_request(client: APIClient, endpoint: str, max_retries: int = 3, delay: float = 1.0):
+    retry = RetryPolicy(max_retries=max_retries - 1, backoff_factor=delay)
+    response = client._make_request('GET', endpoint, retry=retry)
+    if response is None:
+        print("Max retries reached")
+    return response
 
 def main():
     print("API Client Examples")
@@ -184,6 +459,7 @@ def main():
     
     demo_jsonplaceholder()
     demo_weather()
+    demo_async_comments()
     
     print("\nRate Limiting Demo")
     print("=" * 40)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Benchmark Script
+
+Micro-benchmarks for the data processing examples in this repository.
+Run all benchmarks or pick some by name:
+
+    python benchmarks.py
+    python benchmarks.py merge
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from csv_processor import CSVProcessor
+from json_codec import JSONCodec, available_backends
+from json_processor import JSONProcessor
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.3f}s")
+    return result
+
+
+def nested_loop_merge(left, right, on_column):
+    merged = []
+    for row1 in left:
+        for row2 in right:
+            if row1.get(on_column) == row2.get(on_column):
+                merged.append({**row1, **row2})
+    return merged
+
+
+def benchmark_merge(left_rows=20000, right_rows=5000):
+    print(f"\nmerge_csv: {left_rows} x {right_rows} rows (inner join)")
+    orders = CSVProcessor('orders.csv')
+    orders.data = [{'order_id': str(i), 'customer_id': str(random.randrange(right_rows))}
+                   for i in range(left_rows)]
+    customers = CSVProcessor('customers.csv')
+    customers.data = [{'customer_id': str(i), 'name': f'Customer {i}'} for i in range(right_rows)]
+
+    baseline = timed("nested loop", nested_loop_merge, orders.data[:left_rows // 10],
+                     customers.data, 'customer_id')
+    print(f"  (nested loop ran on 1/10 of the left side: {len(baseline)} rows)")
+    timed("hash join", orders.merge_csv, customers, 'customer_id', strategy='hash')
+    timed("sort-merge join (spilling)", orders.merge_csv, customers, 'customer_id',
+          strategy='sort_merge', max_rows_in_memory=left_rows // 8)
+
+
+def peak_memory(func, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def write_benchmark_json(path, records):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump([{'id': i, 'text': f'Quote number {i}', 'author': f'Author {i % 100}',
+                    'tags': ['life', 'love'] if i % 7 == 0 else ['humor']} for i in range(records)], file)
+
+
+def benchmark_json_codec(repeat=50):
+    print(f"\nJSON codec throughput ({repeat} round trips per file)")
+    for filename in ('quotes.json', 'hacker_news_headlines.json'):
+        with open(os.path.join(REPO_DIR, filename), 'rb') as file:
+            raw = file.read()
+        print(f"  {filename} ({len(raw) / 1e3:.1f} kB)")
+        for name in available_backends():
+            codec = JSONCodec(name)
+            data = codec.loads(raw)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                codec.loads(raw)
+            decode = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(repeat):
+                codec.dumpb(data)
+            encode = time.perf_counter() - start
+            megabytes = len(raw) * repeat / 1e6
+            print(f"    {name:<8} decode {megabytes / decode:8.1f} MB/s   encode {megabytes / encode:8.1f} MB/s")
+
+
+def benchmark_json_stream(sizes=(10000, 40000, 160000)):
+    print("\nJSON peak memory: load_json vs iter_json")
+    with tempfile.TemporaryDirectory() as directory:
+        for records in sizes:
+            path = os.path.join(directory, f'{records}.json')
+            write_benchmark_json(path, records)
+            processor = JSONProcessor(path)
+
+            loaded = peak_memory(lambda: processor.filter_data(lambda q: 'love' in q['tags']))
+            processor.data = None
+            streamed = peak_memory(lambda: sum(1 for _ in processor.filter_stream(lambda q: 'love' in q['tags'])))
+            print(f"  {records:>7} records: load_json {loaded / 1e6:8.2f} MB, "
+                  f"iter_json {streamed / 1e6:6.2f} MB")
+
+
+def write_benchmark_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['id', 'name', 'city', 'salary', 'notes'])
+        for i in range(rows):
+            notes = 'multi-line\n"quoted" note' if i % 50 == 0 else 'plain note'
+            writer.writerow([i, f'Person {i}', random.choice(['Berlin', 'Paris', 'Rome']),
+                             random.randint(30000, 120000), notes])
+
+
+def benchmark_parallel_read(rows=500000):
+    print(f"\nread_csv vs read_csv_parallel: {rows} rows")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.csv')
+        write_benchmark_csv(path, rows)
+        chunk_size = max(os.path.getsize(path) // 32, 1)
+
+        timed("read_csv", CSVProcessor(path).read_csv)
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            timed(f"parallel, {workers} worker(s)", CSVProcessor(path).read_csv_parallel,
+                  workers=workers, chunk_size=chunk_size)
+            workers *= 2
+        timed("parallel, columnar", CSVProcessor(path).read_csv_parallel,
+              chunk_size=chunk_size, columnar=True)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    latency = 0.05
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        page = self.path.rstrip('/').rsplit('/', 1)[-1]
+        body = (f"<html><body><div class='quote'><span class='text'>Quote {page}</span>"
+                f"<small class='author'>Author {page}</small>"
+                f"<div class='tags'><a class='tag' href='/tag/{page}'>tag{page}</a></div></div>"
+                f"</body></html>").encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_server(handler=StandInHandler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def benchmark_scraper(pages=50):
+    from web_scraper import WebScraper
+
+    print(f"\nWebScraper: {pages} pages from a local stand-in server "
+          f"({StandInHandler.latency * 1000:.0f} ms latency)")
+    server, base_url = _start_server()
+    try:
+        scraper = WebScraper(base_url, delay=0)
+        urls = [f"{base_url}/page/{i}" for i in range(pages)]
+        scrape = lambda soup: scraper.scrape_text(soup, 'span.text')
+        timed("sequential", scraper.scrape_multiple_pages, urls, scrape)
+        timed("concurrent (10)", scraper.scrape_concurrent, urls, scrape, concurrency=10)
+    finally:
+        server.shutdown()
+
+
+class APIStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.005
+    failure_every = 20
+    counter = itertools.count(1)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if next(self.counter) % self.failure_every == 0:
+            self.send_response(503)
+            self.send_header('Retry-After', '0.05')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps({'path': self.path, 'title': 'stub post'}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def load_test(client_call, requests_total, threads):
+    latencies = []
+
+    def call(i):
+        start = time.perf_counter()
+        ok = client_call(f'/posts/{i}') is not None
+        latencies.append(time.perf_counter() - start)
+        return ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        succeeded = sum(executor.map(call, range(requests_total)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return succeeded, elapsed, p50, p99
+
+
+def legacy_get(session, url, max_retries=3, delay=1.0):
+    # What APIClient.get plus rate_limited_request did before retries moved into the client.
+    for attempt in range(max_retries):
+        try:
+            response = session.get(url)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException:
+            if attempt < max_retries - 1:
+                time.sleep(delay * (2 ** attempt))
+    return None
+
+
+def benchmark_api_client(requests_total=2000, threads=32):
+    from api_client import APIClient, AsyncAPIClient
+
+    print(f"\nAPIClient load test: {requests_total} GETs, {threads} threads, "
+          f"1 in {APIStubHandler.failure_every} answered with 503")
+    server, base_url = _start_server(APIStubHandler)
+    try:
+        legacy = requests.Session()
+        pooled = APIClient(base_url, pool_maxsize=threads)
+        runs = [
+            ("default pool, manual retry", lambda path: legacy_get(legacy, base_url + path)),
+            (f"pool of {threads}, built-in retry", pooled.get),
+        ]
+        for label, call in runs:
+            with contextlib.redirect_stdout(io.StringIO()):
+                succeeded, elapsed, p50, p99 = load_test(call, requests_total, threads)
+            print(f"  {label:<32} {requests_total / elapsed:8.0f} req/s   p50 {p50 * 1000:6.1f} ms   "
+                  f"p99 {p99 * 1000:7.1f} ms   ok {succeeded}/{requests_total}")
+        legacy.close()
+        pooled.close()
+
+        client = AsyncAPIClient(base_url, concurrency=threads)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            results = client.run_all(client.get(f'/posts/{i}') for i in range(requests_total))
+            elapsed = time.perf_counter() - start
+        client.close()
+        succeeded = sum(result is not None for result in results)
+        print(f"  {'async client, gather':<32} {requests_total / elapsed:8.0f} req/s   "
+              f"ok {succeeded}/{requests_total}")
+    finally:
+        server.shutdown()
+
+
+BENCHMARKS = {
+    'api_client': benchmark_api_client,
+    'json_codec': benchmark_json_codec,
+    'json_stream': benchmark_json_stream,
+    'merge': benchmark_merge,
+    'parallel_read': benchmark_parallel_read,
+    'scraper': benchmark_scraper,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run repository benchmarks")
+    parser.add_argument('names', nargs='*',
+                        help=f"Benchmarks to run (default: all): {', '.join(sorted(BENCHMARKS))}")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.names or sorted(BENCHMARKS):
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
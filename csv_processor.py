@@ -1,9 +1,1272 @@
 import csv
 import json
-from typing import List, Dict, Any, Optional, Union
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Union, Iterable, Iterator, Callable
 import os
 from datetime import datetime
-import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice, groupby
+from array import array
+from json_codec import codec
+from external_sort import external_sort, read_run
+import bisect
+import hashlib
+import heapq
+import io
+import math
+import mmap
+import pickle
+import re
+import struct
+import sys
+import tempfile
+import time
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+COLUMNAR_MAGIC = b'CSVCOL1\n'
+PARQUET_MAGIC = b'PAR1'
+
+class _P2Median:
+    # P-squared estimator (Jain & Chlamtac): five markers track the median in O(1) memory.
+    def __init__(self):
+        self.heights = []
+        self.positions = [0, 1, 2, 3, 4]
+        self.desired = [0.0, 1.0, 2.0, 3.0, 4.0]
+    
+    def add(self, value: float):
+        heights, positions = self.heights, self.positions
+        if len(heights) < 5:
+            bisect.insort(heights, value)
+            return
+        
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = bisect.bisect_right(heights, value) - 1
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        count = positions[4]
+        self.desired = [0.0, count / 4, count / 2, 3 * count / 4, float(count)]
+        
+        for i in (1, 2, 3):
+            d = self.desired[i] - positions[i]
+            below, above = positions[i] - positions[i - 1], positions[i + 1] - positions[i]
+            if (d >= 1 and above > 1) or (d <= -1 and below > 1):
+                d = 1 if d > 0 else -1
+                height = heights[i] + d / (above + below) * (
+                    (below + d) * (heights[i + 1] - heights[i]) / above
+                    + (above - d) * (heights[i] - heights[i - 1]) / below)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + d * (heights[i + d] - heights[i]) / (positions[i + d] - positions[i])
+                heights[i] = height
+                positions[i] += d
+    
+    def value(self) -> Optional[float]:
+        if not self.heights:
+            return None
+        if len(self.heights) < 5 or self.positions[4] == 4:
+            middle = len(self.heights) // 2
+            if len(self.heights) % 2:
+                return self.heights[middle]
+            return (self.heights[middle - 1] + self.heights[middle]) / 2
+        return self.heights[2]
+    
+    def to_state(self) -> List[list]:
+        return [self.heights, self.positions]
+    
+    @classmethod
+    def from_state(cls, state: List[list]) -> '_P2Median':
+        sketch = cls()
+        sketch.heights, sketch.positions = list(state[0]), list(state[1])
+        return sketch
+
+class _TopValues:
+    # Space-Saving heavy hitters: at most `capacity` counters, each with an error bound.
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counters: Dict[float, List[int]] = {}
+    
+    def add(self, value: float):
+        counter = self.counters.get(value)
+        if counter is not None:
+            counter[0] += 1
+        elif len(self.counters) < self.capacity:
+            self.counters[value] = [1, 0]
+        else:
+            smallest = min(self.counters, key=lambda key: self.counters[key][0])
+            floor = self.counters.pop(smallest)[0]
+            self.counters[value] = [floor + 1, floor]
+    
+    def mode(self) -> Optional[float]:
+        if not self.counters:
+            return None
+        value, (count, error) = max(self.counters.items(), key=lambda item: item[1][0])
+        return value if count - error > 1 else None
+    
+    def to_state(self) -> List[list]:
+        return [[value, count, error] for value, (count, error) in self.counters.items()]
+    
+    @classmethod
+    def from_state(cls, state: List[list], capacity: int = 64) -> '_TopValues':
+        sketch = cls(capacity)
+        sketch.counters = {value: [count, error] for value, count, error in state}
+        return sketch
+
+class _QuantileSketch:
+    # Mergeable compactor sketch: level i holds values of weight 2**i, and a level that reaches
+    # `capacity` values is sorted and every other value promoted, alternating the starting offset.
+    # Results are exact until the first compaction; after that the rank error is about
+    # log2(n / capacity) / capacity, using O(capacity * log(n / capacity)) memory.
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.levels = [array('d')]
+        self._offset = 0
+    
+    def add(self, value: float):
+        self.levels[0].append(value)
+        if len(self.levels[0]) >= self.capacity:
+            self._compact()
+    
+    def merge(self, other: '_QuantileSketch'):
+        for level, values in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(array('d'))
+            self.levels[level].extend(values)
+        self._compact()
+    
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) >= self.capacity:
+                ordered = sorted(self.levels[level])
+                kept = array('d', [ordered.pop()] if len(ordered) % 2 else [])
+                if level + 1 == len(self.levels):
+                    self.levels.append(array('d'))
+                self.levels[level + 1].extend(ordered[self._offset::2])
+                self.levels[level] = kept
+                self._offset ^= 1
+            level += 1
+    
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+    
+    def quantile(self, fraction: float) -> Optional[float]:
+        if self.exact:
+            ordered = sorted(self.levels[0])
+            if not ordered:
+                return None
+            rank = (len(ordered) - 1) * fraction
+            lower = math.floor(rank)
+            upper = min(lower + 1, len(ordered) - 1)
+            return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+        weighted = sorted((value, 1 << level) for level, values in enumerate(self.levels) for value in values)
+        target = fraction * sum(weight for _, weight in weighted)
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return value
+        return weighted[-1][0]
+
+class _HyperLogLog:
+    # 2**precision one-byte registers; the relative error is about 1.04 / sqrt(2**precision),
+    # 1.6% for the default 4 KB sketch. Merging takes the register-wise maximum.
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+    
+    def add(self, value: Any):
+        digest = int.from_bytes(hashlib.blake2b(repr(value).encode('utf-8'), digest_size=8).digest(), 'big')
+        width = 64 - self.precision
+        rest = digest & ((1 << width) - 1)
+        index = digest >> width
+        self.registers[index] = max(self.registers[index], width - rest.bit_length() + 1)
+    
+    def merge(self, other: '_HyperLogLog'):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+    
+    def count(self) -> int:
+        size = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / sum(2.0 ** -rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+class ColumnStats:
+    # Median and mode are exact while the column has at most max_distinct distinct values;
+    # past that the exact counts are dropped and the bounded sketches take over.
+    # max_distinct=None keeps them exact regardless of memory.
+    def __init__(self, max_distinct: Optional[int] = 10000):
+        self.count = 0
+        self.mean = 0.0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self._m2 = 0.0
+        self.max_distinct = max_distinct
+        self._counts = Counter()
+        self._median = _P2Median()
+        self._top = _TopValues()
+    
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self._median.add(value)
+        self._top.add(value)
+        if self._counts is not None:
+            self._counts[value] += 1
+            if self.max_distinct is not None and len(self._counts) > self.max_distinct:
+                self._counts = None
+    
+    @property
+    def exact(self) -> bool:
+        return self._counts is not None
+    
+    def median(self) -> Optional[float]:
+        if not self.count:
+            return None
+        if self._counts is None:
+            return self._median.value()
+        lower, upper = (self.count - 1) // 2, self.count // 2
+        low_value = None
+        seen = 0
+        for value in sorted(self._counts):
+            seen += self._counts[value]
+            if low_value is None and seen > lower:
+                low_value = value
+            if seen > upper:
+                return (low_value + value) / 2
+        return None
+    
+    def mode(self) -> Optional[float]:
+        if self._counts is None:
+            return self._top.mode()
+        if len(self._counts) == self.count:
+            return None
+        return self._counts.most_common(1)[0][0]
+    
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0
+    
+    def to_state(self) -> Dict[str, Any]:
+        return {'count': self.count, 'mean': self.mean, 'sum': self.sum, 'min': self.min,
+                'max': self.max, 'm2': self._m2, 'max_distinct': self.max_distinct,
+                'counts': list(self._counts.items()) if self._counts is not None else None,
+                'median': self._median.to_state(), 'top': self._top.to_state()}
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'ColumnStats':
+        stats = cls(state.get('max_distinct', 10000))
+        stats.count, stats.mean, stats.sum = state['count'], state['mean'], state['sum']
+        stats.min, stats.max, stats._m2 = state['min'], state['max'], state['m2']
+        stats._counts = Counter(dict(state['counts'])) if state['counts'] is not None else None
+        if 'median' in state:
+            stats._median = _P2Median.from_state(state['median'])
+            stats._top = _TopValues.from_state(state['top'])
+        else:
+            for value, count in stats._counts.items():
+                for _ in range(count):
+                    stats._median.add(value)
+                    stats._top.add(value)
+        return stats
+    
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"error": "No numeric values found"}
+        
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "median": self.median(),
+            "mode": self.mode(),
+            "min": self.min,
+            "max": self.max,
+            "sum": self.sum,
+            "std_dev": math.sqrt(self.variance()),
+            "exact": self.exact
+        }
+
+def _collect_column_stats(rows: Iterable[Dict[str, Any]], column: str,
+                          max_distinct: Optional[int] = 10000) -> ColumnStats:
+    stats = ColumnStats(max_distinct)
+    for row in rows:
+        value = row.get(column)
+        if value is not None:
+            try:
+                stats.add(float(value))
+            except ValueError:
+                pass
+    return stats
+
+JOIN_TYPES = ('inner', 'left', 'right', 'outer', 'semi', 'anti')
+
+def _join_columns(on: Union[str, List[str]]) -> List[str]:
+    return [on] if isinstance(on, str) else list(on)
+
+def _join_key(row: Dict[str, Any], columns: List[str]) -> tuple:
+    return tuple(row.get(column) for column in columns)
+
+def _sortable_key(row: Dict[str, Any], columns: List[str]) -> tuple:
+    return tuple((row.get(column) is None, str(row.get(column) or '')) for column in columns)
+
+def _build_hash_table(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Dict[tuple, List[Dict[str, Any]]]:
+    table = {}
+    for row in rows:
+        table.setdefault(_join_key(row, columns), []).append(row)
+    return table
+
+def hash_join(left: Iterable[Dict[str, Any]], right: Iterable[Dict[str, Any]],
+              on: Union[str, List[str]], how: str = 'inner',
+              build_left: bool = False) -> Iterator[Dict[str, Any]]:
+    columns = _join_columns(on)
+    
+    if how == 'right' or (build_left and how == 'inner'):
+        table = _build_hash_table(left, columns)
+        for right_row in right:
+            matches = table.get(_join_key(right_row, columns))
+            if matches:
+                for left_row in matches:
+                    yield {**left_row, **right_row}
+            elif how == 'right':
+                yield right_row.copy()
+        return
+    
+    table = _build_hash_table(right, columns)
+    matched_keys = set()
+    for left_row in left:
+        key = _join_key(left_row, columns)
+        matches = table.get(key)
+        if how == 'semi':
+            if matches:
+                yield left_row.copy()
+        elif how == 'anti':
+            if not matches:
+                yield left_row.copy()
+        elif matches:
+            matched_keys.add(key)
+            for right_row in matches:
+                yield {**left_row, **right_row}
+        elif how in ('left', 'outer'):
+            yield left_row.copy()
+    
+    if how == 'outer':
+        for key, rows in table.items():
+            if key not in matched_keys:
+                for right_row in rows:
+                    yield right_row.copy()
+
+class _Descending:
+    __slots__ = ('value',)
+    
+    def __init__(self, value: Any):
+        self.value = value
+    
+    def __lt__(self, other: '_Descending') -> bool:
+        return other.value < self.value
+    
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+def _typed_sort_value(value: Any, key_type: str, collation, date_format: str) -> tuple:
+    if value is None or value == '':
+        return (2, '')
+    if key_type in ('auto', 'numeric'):
+        try:
+            return (0, float(value))
+        except (TypeError, ValueError):
+            if key_type == 'numeric':
+                return (2, '')
+    elif key_type == 'date':
+        if isinstance(value, datetime):
+            return (0, value)
+        try:
+            return (0, datetime.strptime(str(value), date_format))
+        except ValueError:
+            return (2, '')
+    text = str(value)
+    return (1, collation(text) if collation else text)
+
+def make_sort_key(columns: Union[str, List[str]], reverse: Union[bool, List[bool]] = False,
+                  types: Optional[Dict[str, str]] = None, collation=None,
+                  date_format: str = '%Y-%m-%d'):
+    columns = _join_columns(columns)
+    directions = reverse if isinstance(reverse, list) else [reverse] * len(columns)
+    specs = [(column, (types or {}).get(column, 'auto'), descending)
+             for column, descending in zip(columns, directions)]
+    
+    def key(row: Dict[str, Any]) -> tuple:
+        parts = []
+        for column, key_type, descending in specs:
+            typed = _typed_sort_value(row.get(column), key_type, collation, date_format)
+            parts.append((typed[0] == 2, _Descending(typed) if descending else typed))
+        return tuple(parts)
+    
+    return key
+
+def sort_merge_join(left: Iterable[Dict[str, Any]], right: Iterable[Dict[str, Any]],
+                    on: Union[str, List[str]], how: str = 'inner',
+                    max_rows_in_memory: int = 100000) -> Iterator[Dict[str, Any]]:
+    columns = _join_columns(on)
+    key = lambda row: _sortable_key(row, columns)
+    left_groups = groupby(external_sort(left, key, max_rows_in_memory=max_rows_in_memory), key)
+    right_groups = groupby(external_sort(right, key, max_rows_in_memory=max_rows_in_memory), key)
+    
+    left_group = next(left_groups, None)
+    right_group = next(right_groups, None)
+    while left_group is not None or right_group is not None:
+        if right_group is None or (left_group is not None and left_group[0] < right_group[0]):
+            if how in ('left', 'outer', 'anti'):
+                for row in left_group[1]:
+                    yield row.copy()
+            left_group = next(left_groups, None)
+        elif left_group is None or right_group[0] < left_group[0]:
+            if how in ('right', 'outer'):
+                for row in right_group[1]:
+                    yield row.copy()
+            right_group = next(right_groups, None)
+        else:
+            if how == 'semi':
+                for row in left_group[1]:
+                    yield row.copy()
+            elif how != 'anti':
+                right_rows = list(right_group[1])
+                for left_row in left_group[1]:
+                    for right_row in right_rows:
+                        yield {**left_row, **right_row}
+            left_group = next(left_groups, None)
+            right_group = next(right_groups, None)
+
+class CountAggregate:
+    def __init__(self):
+        self.value = 0
+    
+    def add(self, value: Any):
+        if value is not None and value != '':
+            self.value += 1
+    
+    def merge(self, other: 'CountAggregate'):
+        self.value += other.value
+    
+    def result(self) -> Any:
+        return self.value
+
+class RowCountAggregate(CountAggregate):
+    def add(self, value: Any):
+        self.value += 1
+
+class ExactCountDistinctAggregate:
+    def __init__(self):
+        self.values = set()
+    
+    def add(self, value: Any):
+        if value is not None and value != '':
+            self.values.add(value)
+    
+    def merge(self, other: 'ExactCountDistinctAggregate'):
+        self.values |= other.values
+    
+    def result(self) -> int:
+        return len(self.values)
+
+class CountDistinctAggregate:
+    # Exact while a group has at most max_exact distinct values, then a HyperLogLog estimate.
+    max_exact = 1024
+    
+    def __init__(self):
+        self.values = set()
+        self.sketch: Optional[_HyperLogLog] = None
+    
+    def add(self, value: Any):
+        if value is None or value == '':
+            return
+        if self.sketch is not None:
+            self.sketch.add(value)
+            return
+        self.values.add(value)
+        if len(self.values) > self.max_exact:
+            self._switch_to_sketch()
+    
+    def _switch_to_sketch(self):
+        self.sketch = _HyperLogLog()
+        for value in self.values:
+            self.sketch.add(value)
+        self.values = set()
+    
+    def merge(self, other: 'CountDistinctAggregate'):
+        if self.sketch is None and other.sketch is None:
+            self.values |= other.values
+            if len(self.values) > self.max_exact:
+                self._switch_to_sketch()
+            return
+        if self.sketch is None:
+            self._switch_to_sketch()
+        if other.sketch is None:
+            for value in other.values:
+                self.sketch.add(value)
+        else:
+            self.sketch.merge(other.sketch)
+    
+    def result(self) -> int:
+        return len(self.values) if self.sketch is None else self.sketch.count()
+
+class NumericAggregate:
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+    
+    def add(self, value: Any):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return
+        self.count += 1
+        self.sum += number
+        self.min = number if self.min is None else min(self.min, number)
+        self.max = number if self.max is None else max(self.max, number)
+    
+    def merge(self, other: 'NumericAggregate'):
+        self.count += other.count
+        self.sum += other.sum
+        for bound, pick in (('min', min), ('max', max)):
+            values = [value for value in (getattr(self, bound), getattr(other, bound)) if value is not None]
+            setattr(self, bound, pick(values) if values else None)
+
+class SumAggregate(NumericAggregate):
+    def result(self) -> float:
+        return self.sum
+
+class MeanAggregate(NumericAggregate):
+    def result(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+class MinAggregate(NumericAggregate):
+    def result(self) -> Optional[float]:
+        return self.min
+
+class MaxAggregate(NumericAggregate):
+    def result(self) -> Optional[float]:
+        return self.max
+
+class ExactPercentileAggregate:
+    def __init__(self, percentile: float = 50):
+        self.percentile = percentile
+        self.values = array('d')
+    
+    def add(self, value: Any):
+        try:
+            self.values.append(float(value))
+        except (TypeError, ValueError):
+            pass
+    
+    def merge(self, other: 'ExactPercentileAggregate'):
+        self.values.extend(other.values)
+    
+    def result(self) -> Optional[float]:
+        if not self.values:
+            return None
+        ordered = sorted(self.values)
+        rank = (len(ordered) - 1) * self.percentile / 100
+        lower = math.floor(rank)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+class PercentileAggregate:
+    # Exact for groups of fewer than _QuantileSketch.capacity values, approximate beyond that.
+    def __init__(self, percentile: float = 50):
+        self.percentile = percentile
+        self.sketch = _QuantileSketch()
+    
+    def add(self, value: Any):
+        try:
+            self.sketch.add(float(value))
+        except (TypeError, ValueError):
+            pass
+    
+    def merge(self, other: 'PercentileAggregate'):
+        self.sketch.merge(other.sketch)
+    
+    def result(self) -> Optional[float]:
+        return self.sketch.quantile(self.percentile / 100)
+
+AGGREGATES = {
+    'count': CountAggregate,
+    'count_distinct': CountDistinctAggregate,
+    'sum': SumAggregate,
+    'mean': MeanAggregate,
+    'min': MinAggregate,
+    'max': MaxAggregate,
+    'median': PercentileAggregate,
+    'percentile': PercentileAggregate,
+}
+
+# Used instead of AGGREGATES entries when a GroupBy is built with exact=True.
+EXACT_AGGREGATES = {
+    'count_distinct': ExactCountDistinctAggregate,
+    'median': ExactPercentileAggregate,
+    'percentile': ExactPercentileAggregate,
+}
+
+class GroupBy:
+    # median, percentile and count_distinct use bounded sketches unless exact=True, so their
+    # results are approximate for large groups (see PercentileAggregate, CountDistinctAggregate).
+    def __init__(self, rows: Iterable[Dict[str, Any]], columns: Union[str, List[str]],
+                 max_groups: int = 100000, partitions: int = 16, exact: bool = False):
+        self.rows = rows
+        self.columns = _join_columns(columns)
+        self.max_groups = max_groups
+        self.partitions = partitions
+        self.exact = exact
+    
+    def _parse_specs(self, aggregations: Dict[str, tuple]) -> List[tuple]:
+        specs = []
+        for alias, (column, name, *args) in aggregations.items():
+            if name not in AGGREGATES:
+                raise ValueError(f"Unknown aggregate: {name}")
+            factory = RowCountAggregate if name == 'count' and column == '*' else AGGREGATES[name]
+            if self.exact:
+                factory = EXACT_AGGREGATES.get(name, factory)
+            specs.append((alias, column, factory, args))
+        return specs
+    
+    def _spill(self, groups: Dict[tuple, list], runs: List[Any]):
+        if not runs:
+            runs.extend(tempfile.TemporaryFile() for _ in range(self.partitions))
+        for key, states in groups.items():
+            pickle.dump((key, states), runs[hash(key) % self.partitions], pickle.HIGHEST_PROTOCOL)
+        groups.clear()
+    
+    def _merged_partitions(self, runs: List[Any]) -> Iterator[Dict[tuple, list]]:
+        for run in runs:
+            run.seek(0)
+            groups = {}
+            for key, states in read_run(run):
+                if key in groups:
+                    for state, other in zip(groups[key], states):
+                        state.merge(other)
+                else:
+                    groups[key] = states
+            yield groups
+    
+    def agg(self, **aggregations: tuple) -> List[Dict[str, Any]]:
+        specs = self._parse_specs(aggregations)
+        groups: Dict[tuple, list] = {}
+        runs: List[Any] = []
+        
+        for row in self.rows:
+            key = _join_key(row, self.columns)
+            states = groups.get(key)
+            if states is None:
+                if len(groups) >= self.max_groups:
+                    self._spill(groups, runs)
+                states = groups[key] = [factory(*args) for _, _, factory, args in specs]
+            for state, (_, column, _, _) in zip(states, specs):
+                state.add(row.get(column))
+        
+        if runs:
+            self._spill(groups, runs)
+            partitions = self._merged_partitions(runs)
+        else:
+            partitions = [groups]
+        
+        results = []
+        for partition in partitions:
+            for key, states in partition.items():
+                result = dict(zip(self.columns, key))
+                for state, (alias, _, _, _) in zip(states, specs):
+                    result[alias] = state.result()
+                results.append(result)
+        return results
+
+class RowStream:
+    def __init__(self, source: Callable[[], Iterable[Dict[str, Any]]]):
+        self._source = source
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._source())
+    
+    def filter(self, condition) -> 'RowStream':
+        if isinstance(condition, Expr):
+            condition = condition.compile()
+        return RowStream(lambda: (row for row in self if condition(row)))
+    
+    def map(self, func) -> 'RowStream':
+        return RowStream(lambda: (func(row) for row in self))
+    
+    def limit(self, n: int) -> 'RowStream':
+        return RowStream(lambda: islice(self, n))
+    
+    def aggregate(self, func, initial: Any) -> Any:
+        result = initial
+        for row in self:
+            result = func(result, row)
+        return result
+    
+    def count(self) -> int:
+        return sum(1 for _ in self)
+    
+    def column_stats(self, column: str, exact: bool = False) -> Dict[str, Any]:
+        return _collect_column_stats(self, column, None if exact else 10000).to_dict()
+    
+    def join(self, other: Iterable[Dict[str, Any]], on: Union[str, List[str]], how: str = 'inner',
+             max_rows_in_memory: int = 100000) -> 'RowStream':
+        return RowStream(lambda: sort_merge_join(self, other, on, how, max_rows_in_memory))
+    
+    def sort(self, columns: Union[str, List[str]], reverse: Union[bool, List[bool]] = False,
+             types: Optional[Dict[str, str]] = None, collation=None, date_format: str = '%Y-%m-%d',
+             max_rows_in_memory: int = 100000) -> 'RowStream':
+        key = make_sort_key(columns, reverse, types, collation, date_format)
+        return RowStream(lambda: external_sort(self, key, max_rows_in_memory=max_rows_in_memory))
+    
+    def top_k(self, columns: Union[str, List[str]], k: int, reverse: Union[bool, List[bool]] = True,
+              types: Optional[Dict[str, str]] = None, collation=None,
+              date_format: str = '%Y-%m-%d') -> List[Dict[str, Any]]:
+        return heapq.nsmallest(k, self, key=make_sort_key(columns, reverse, types, collation, date_format))
+    
+    def group_by(self, columns: Union[str, List[str]], max_groups: int = 100000,
+                 partitions: int = 16, exact: bool = False) -> GroupBy:
+        return GroupBy(self, columns, max_groups, partitions, exact)
+    
+    def collect(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+def _num(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def _text(value: Any) -> str:
+    return '' if value is None else str(value)
+
+class Expr(ABC):
+    def __and__(self, other: 'Expr') -> 'Expr':
+        return BoolExpr('and', [self, other])
+    
+    def __or__(self, other: 'Expr') -> 'Expr':
+        return BoolExpr('or', [self, other])
+    
+    def __invert__(self) -> 'Expr':
+        return BoolExpr('not', [self])
+    
+    @abstractmethod
+    def source(self, accessor, namespace: Dict[str, Any]) -> str:
+        pass
+    
+    def compile(self, headers: Optional[List[str]] = None):
+        namespace = {'_num': _num, '_text': _text}
+        if headers is None:
+            accessor = lambda column: f"r.get({column!r})"
+        else:
+            positions = {column: i for i, column in enumerate(headers)}
+            accessor = lambda column: f"r[{positions[column]}]" if column in positions else "None"
+        code = f"def _predicate(r):\n    return {self.source(accessor, namespace)}\n"
+        exec(code, namespace)
+        return namespace['_predicate']
+    
+    @abstractmethod
+    def mask(self, table: 'ColumnarTable') -> List[bool]:
+        pass
+    
+    def __call__(self, row: Dict[str, Any]) -> bool:
+        predicate = self.__dict__.get('_predicate')
+        if predicate is None:
+            predicate = self._predicate = self.compile()
+        return predicate(row)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop('_predicate', None)
+        return state
+
+class ColumnRef:
+    def __init__(self, name: str):
+        self.name = name
+    
+    def _compare(self, op: str, value: Any) -> 'Comparison':
+        return Comparison(self.name, op, value)
+    
+    def __eq__(self, value: Any) -> 'Comparison':
+        return self._compare('==', value)
+    
+    def __ne__(self, value: Any) -> 'Comparison':
+        return self._compare('!=', value)
+    
+    def __lt__(self, value: Any) -> 'Comparison':
+        return self._compare('<', value)
+    
+    def __le__(self, value: Any) -> 'Comparison':
+        return self._compare('<=', value)
+    
+    def __gt__(self, value: Any) -> 'Comparison':
+        return self._compare('>', value)
+    
+    def __ge__(self, value: Any) -> 'Comparison':
+        return self._compare('>=', value)
+    
+    def isin(self, values: Iterable[Any]) -> 'Comparison':
+        return Comparison(self.name, 'in', list(values))
+    
+    def between(self, low: Any, high: Any) -> 'Comparison':
+        return Comparison(self.name, 'between', (low, high))
+    
+    def matches(self, pattern: str) -> 'Comparison':
+        return Comparison(self.name, 'regex', pattern)
+
+def col(name: str) -> ColumnRef:
+    return ColumnRef(name)
+
+class Comparison(Expr):
+    OPERATORS = {'==': lambda a, b: a == b, '!=': lambda a, b: a != b,
+                 '<': lambda a, b: a < b, '<=': lambda a, b: a <= b,
+                 '>': lambda a, b: a > b, '>=': lambda a, b: a >= b}
+    
+    def __init__(self, column: str, op: str, value: Any):
+        self.column = column
+        self.op = op
+        self.value = value
+    
+    @property
+    def numeric(self) -> bool:
+        values = self.value if self.op in ('in', 'between') else [self.value]
+        return all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values)
+    
+    def source(self, accessor, namespace: Dict[str, Any]) -> str:
+        name = f"_v{len(namespace)}"
+        convert = '_num' if self.numeric and self.op != 'regex' else '_text'
+        field = f"{convert}({accessor(self.column)})"
+        if self.op == 'regex':
+            namespace[name] = re.compile(self.value)
+            return f"({name}.search({field}) is not None)"
+        if self.op == 'in':
+            namespace[name] = set(float(v) for v in self.value) if self.numeric else set(map(_text, self.value))
+            return f"({field} in {name})"
+        if self.op == 'between':
+            low, high = self.value
+            namespace[name] = (float(low), float(high)) if self.numeric else (_text(low), _text(high))
+            return f"({name}[0] <= {field} <= {name}[1])"
+        namespace[name] = float(self.value) if self.numeric else _text(self.value)
+        return f"({field} {self.op} {name})"
+    
+    def value_predicate(self):
+        namespace = {'_num': _num, '_text': _text}
+        code = f"def _predicate(value):\n    return {self.source(lambda column: 'value', namespace)}\n"
+        exec(code, namespace)
+        return namespace['_predicate']
+    
+    def mask(self, table: 'ColumnarTable') -> List[bool]:
+        if self.column not in table.columns:
+            return [self.value_predicate()(None)] * len(table)
+        return table.columns[self.column].mask(self.value_predicate())
+
+class BoolExpr(Expr):
+    def __init__(self, op: str, operands: List[Expr]):
+        self.op = op
+        self.operands = operands
+    
+    def source(self, accessor, namespace: Dict[str, Any]) -> str:
+        if self.op == 'not':
+            return f"(not {self.operands[0].source(accessor, namespace)})"
+        return '(' + f' {self.op} '.join(operand.source(accessor, namespace) for operand in self.operands) + ')'
+    
+    def mask(self, table: 'ColumnarTable') -> List[bool]:
+        masks = [operand.mask(table) for operand in self.operands]
+        if self.op == 'not':
+            return [not keep for keep in masks[0]]
+        if self.op == 'and':
+            return [all(keeps) for keeps in zip(*masks)]
+        return [any(keeps) for keeps in zip(*masks)]
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+def _parse_numeric(value: Any, parse: Callable, parse_text: bool) -> Any:
+    # Typed numbers are kept as they are; text is only converted when it round-trips exactly,
+    # so values such as '02134', '1_000' or ' 7' stay strings.
+    if isinstance(value, bool):
+        raise TypeError(value)
+    if isinstance(value, (int, float)):
+        parsed = parse(value)
+        if parsed != value or (parse is int and not isinstance(value, int)):
+            raise ValueError(value)
+        return parsed
+    if not parse_text or not isinstance(value, str):
+        raise TypeError(value)
+    parsed = parse(value)
+    if str(parsed) != value:
+        raise ValueError(value)
+    return parsed
+
+def _infer_numeric(categories: List[Any], parse_text: bool = False):
+    for dtype, parse, typecode in (('int', int, 'q'), ('float', float, 'd')):
+        try:
+            parsed = [_parse_numeric(value, parse, parse_text) for value in categories]
+        except (ValueError, TypeError, OverflowError):
+            continue
+        if dtype == 'int' and any(not INT64_MIN <= value <= INT64_MAX for value in parsed):
+            return None
+        return dtype, parsed, typecode
+    return None
+
+class Column:
+    def __init__(self, dtype: str, values: array, categories: Optional[List[Any]] = None):
+        self.dtype = dtype
+        self.values = values
+        self.categories = categories
+    
+    @classmethod
+    def from_values(cls, values: Iterable[Any], parse_text: bool = False) -> 'Column':
+        encoder = {}
+        categories = []
+        codes = array('I')
+        for value in values:
+            code = encoder.get(value)
+            if code is None:
+                code = encoder[value] = len(categories)
+                categories.append(value)
+            codes.append(code)
+        return cls.from_codes(codes, categories, parse_text)
+    
+    @classmethod
+    def from_codes(cls, codes: array, categories: List[Any], parse_text: bool = False) -> 'Column':
+        numeric = _infer_numeric(categories, parse_text) if categories else None
+        if numeric is None:
+            return cls('str', codes, categories)
+        dtype, parsed, typecode = numeric
+        try:
+            return cls(dtype, array(typecode, (parsed[code] for code in codes)))
+        except OverflowError:
+            return cls('str', codes, categories)
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def __getitem__(self, index: int) -> Any:
+        if self.categories is not None:
+            return self.categories[self.values[index]]
+        return self.values[index]
+    
+    def __iter__(self) -> Iterator[Any]:
+        if self.categories is not None:
+            categories = self.categories
+            return (categories[code] for code in self.values)
+        return iter(self.values)
+    
+    def mask(self, predicate) -> List[bool]:
+        # Numeric columns only hold values whose str() is the original CSV text (see
+        # _parse_numeric), so text comparisons see the same strings as in row mode.
+        if self.categories is not None:
+            matches = [bool(predicate(value)) for value in self.categories]
+            return [matches[code] for code in self.values]
+        return [bool(predicate(value)) for value in self.values]
+    
+    @property
+    def typecode(self) -> str:
+        return getattr(self.values, 'typecode', None) or self.values.format
+    
+    def take(self, indices: Iterable[int]) -> 'Column':
+        values = self.values
+        return Column(self.dtype, array(self.typecode, (values[i] for i in indices)), self.categories)
+    
+    def map(self, func) -> 'Column':
+        if self.categories is not None:
+            return Column.from_codes(self.values, [func(value) for value in self.categories])
+        return Column.from_values(func(value) for value in self.values)
+
+class TableRows:
+    def __init__(self, table: 'ColumnarTable'):
+        self._table = table
+    
+    def __len__(self) -> int:
+        return len(self._table)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        columns = self._table.columns
+        return {name: column[index] for name, column in columns.items()}
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        columns = self._table.columns
+        names = list(columns)
+        for values in zip(*columns.values()):
+            yield dict(zip(names, values))
+
+class ColumnarTable:
+    def __init__(self, columns: Dict[str, Column]):
+        self.columns = columns
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], headers: Optional[List[str]] = None,
+                  parse_text: bool = False) -> 'ColumnarTable':
+        encoders = {}
+        categories = {}
+        codes = {}
+        for row in rows:
+            if headers is None:
+                headers = list(row)
+            if not encoders:
+                for name in headers:
+                    encoders[name], categories[name], codes[name] = {}, [], array('I')
+            for name in headers:
+                value = row.get(name)
+                encoder = encoders[name]
+                code = encoder.get(value)
+                if code is None:
+                    code = encoder[value] = len(categories[name])
+                    categories[name].append(value)
+                codes[name].append(code)
+        return cls({name: Column.from_codes(codes[name], categories[name], parse_text) for name in encoders})
+    
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+    
+    def rows(self) -> TableRows:
+        return TableRows(self)
+    
+    def take(self, indices: List[int]) -> 'ColumnarTable':
+        return ColumnarTable({name: column.take(indices) for name, column in self.columns.items()})
+    
+    def filter(self, column: str, predicate) -> 'ColumnarTable':
+        mask = self.columns[column].mask(predicate)
+        return self.take([i for i, keep in enumerate(mask) if keep])
+    
+    def where(self, expr: Expr) -> 'ColumnarTable':
+        return self.take([i for i, keep in enumerate(expr.mask(self)) if keep])
+    
+    def sort(self, column: str, reverse: bool = False, types: Optional[Dict[str, str]] = None,
+             collation=None, date_format: str = '%Y-%m-%d') -> 'ColumnarTable':
+        target = self.columns[column]
+        if target.categories is None and not types and collation is None:
+            # Numeric columns have no empty values, so plain value order matches make_sort_key.
+            return self.take(sorted(range(len(target)), key=target.values.__getitem__, reverse=reverse))
+        
+        # Same keys as the row path (empties last, per-column direction), computed once per category.
+        key = make_sort_key(column, reverse, types, collation, date_format)
+        if target.categories is None:
+            keys = [key({column: value}) for value in target.values]
+            return self.take(sorted(range(len(keys)), key=keys.__getitem__))
+        category_keys = [key({column: value}) for value in target.categories]
+        codes = target.values
+        return self.take(sorted(range(len(codes)), key=lambda i: category_keys[codes[i]]))
+    
+    def group_indices(self, column: str) -> Dict[Any, List[int]]:
+        target = self.columns[column]
+        groups = {}
+        for i, key in enumerate(target.values):
+            groups.setdefault(key, []).append(i)
+        if target.categories is not None:
+            return {target.categories[code]: indices for code, indices in groups.items()}
+        return groups
+    
+    def column_stats(self, column: str, max_distinct: Optional[int] = 10000) -> ColumnStats:
+        target = self.columns[column]
+        stats = ColumnStats(max_distinct)
+        if target.categories is None:
+            for value in target.values:
+                stats.add(float(value))
+            return stats
+        return _collect_column_stats(({column: value} for value in target), column, max_distinct)
+
+def _count_quotes(file, start: int, end: int, quotechar: bytes, block_size: int = 1 << 20) -> int:
+    file.seek(start)
+    count = 0
+    remaining = end - start
+    while remaining > 0:
+        block = file.read(min(block_size, remaining))
+        if not block:
+            break
+        count += block.count(quotechar)
+        remaining -= len(block)
+    return count
+
+def find_record_boundaries(file_path: str, chunk_size: int, start: int = 0,
+                           quotechar: str = '"') -> List[int]:
+    quote = quotechar.encode('ascii')
+    boundaries = [start]
+    with open(file_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        position = start
+        in_quotes = False
+        target = start + chunk_size
+        while target < size:
+            in_quotes ^= bool(_count_quotes(file, position, target, quote) & 1)
+            file.seek(target)
+            position = target
+            while True:
+                line = file.readline()
+                if not line:
+                    break
+                in_quotes ^= bool(line.count(quote) & 1)
+                position += len(line)
+                if not in_quotes:
+                    break
+            if position >= size:
+                break
+            boundaries.append(position)
+            target = position + chunk_size
+    boundaries.append(size)
+    return boundaries
+
+def _parse_chunk(file_path: str, start: int, end: int, encoding: str, delimiter: str,
+                 headers: Optional[List[str]]) -> List[Any]:
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode(encoding)
+    
+    # Workers send column tuples (or bare rows when there is no header) and the parent owns the
+    # headers, so the payload neither repeats column names nor unpickles one object per row.
+    rows = list(csv.reader(io.StringIO(text, newline=''), delimiter=delimiter))
+    if headers is None:
+        return rows
+    width = len(headers)
+    if any(len(row) != width for row in rows):
+        for row in rows:
+            if len(row) != width:
+                print(f"Skipping row with mismatched columns: {row}")
+        rows = [row for row in rows if len(row) == width]
+    return list(zip(*rows)) or [()] * width
+
+class HashIndex:
+    kind = 'hash'
+    
+    def __init__(self, column: str):
+        self.column = column
+        self.positions: Dict[Any, List[int]] = {}
+    
+    def build(self, rows: Iterable[Dict[str, Any]]) -> 'HashIndex':
+        self.positions = {}
+        for position, row in enumerate(rows):
+            self.positions.setdefault(row.get(self.column), []).append(position)
+        return self
+    
+    def lookup(self, value: Any) -> List[int]:
+        return self.positions.get(value, [])
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'kind': self.kind, 'column': self.column, 'entries': list(self.positions.items())}
+    
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'HashIndex':
+        index = cls(state['column'])
+        index.positions = {value: positions for value, positions in state['entries']}
+        return index
+
+class SortedIndex:
+    kind = 'sorted'
+    
+    def __init__(self, column: str):
+        self.column = column
+        self.numeric = True
+        self.keys: List[Any] = []
+        self.positions: List[int] = []
+    
+    def _key(self, value: Any) -> Any:
+        if self.numeric:
+            return float(value)
+        return '' if value is None else str(value)
+    
+    def build(self, rows: Iterable[Dict[str, Any]]) -> 'SortedIndex':
+        values = [row.get(self.column) for row in rows]
+        try:
+            keys = [float(value) for value in values]
+            self.numeric = True
+        except (TypeError, ValueError):
+            self.numeric = False
+            keys = [self._key(value) for value in values]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.positions = order
+        return self
+    
+    def range(self, low: Any = None, high: Any = None, inclusive: bool = True) -> List[int]:
+        start = 0
+        end = len(self.keys)
+        if low is not None:
+            find = bisect.bisect_left if inclusive else bisect.bisect_right
+            start = find(self.keys, self._key(low))
+        if high is not None:
+            find = bisect.bisect_right if inclusive else bisect.bisect_left
+            end = find(self.keys, self._key(high))
+        return self.positions[start:end]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'kind': self.kind, 'column': self.column, 'numeric': self.numeric,
+                'keys': self.keys, 'positions': self.positions}
+    
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'SortedIndex':
+        index = cls(state['column'])
+        index.numeric = state['numeric']
+        index.keys = state['keys']
+        index.positions = state['positions']
+        return index
+
+INDEX_TYPES = {'hash': HashIndex, 'sorted': SortedIndex}
+
+def _write_native_columnar(table: ColumnarTable, output_path: str):
+    blocks = []
+    meta = []
+    offset = 0
+    for name, column in table.columns.items():
+        data = column.values.tobytes()
+        categories = json.dumps(column.categories).encode('utf-8') if column.categories is not None else b''
+        meta.append({'name': name, 'dtype': column.dtype, 'typecode': column.typecode,
+                     'offset': offset, 'length': len(data), 'categories_length': len(categories)})
+        padding = -(len(data) + len(categories)) % 8
+        blocks.extend([data, categories, b'\0' * padding])
+        offset += len(data) + len(categories) + padding
+    
+    header = json.dumps({'rows': len(table), 'byteorder': sys.byteorder, 'columns': meta}).encode('utf-8')
+    header += b' ' * (-(len(COLUMNAR_MAGIC) + 8 + len(header)) % 8)
+    with open(output_path, 'wb') as file:
+        file.write(COLUMNAR_MAGIC)
+        file.write(struct.pack('<Q', len(header)))
+        file.write(header)
+        for block in blocks:
+            file.write(block)
+
+def _read_native_columnar(input_path: str, columns: Optional[List[str]] = None) -> Dict[str, Column]:
+    with open(input_path, 'rb') as file:
+        if file.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{input_path} is not a columnar file")
+        header_length = struct.unpack('<Q', file.read(8))[0]
+        header = json.loads(file.read(header_length))
+        data_start = len(COLUMNAR_MAGIC) + 8 + header_length
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    result = {}
+    for entry in header['columns']:
+        if columns is not None and entry['name'] not in columns:
+            continue
+        start = data_start + entry['offset']
+        values = memoryview(mapped)[start:start + entry['length']].cast(entry['typecode'])
+        if header['byteorder'] != sys.byteorder:
+            values = array(entry['typecode'], values)
+            values.byteswap()
+        categories = None
+        if entry['categories_length']:
+            end = start + entry['length']
+            categories = json.loads(mapped[end:end + entry['categories_length']])
+        result[entry['name']] = Column(entry['dtype'], values, categories)
+    return result
 
 class CSVProcessor:
     def __init__(self, file_path: str, delimiter: str = ',', encoding: str = 'utf-8'):
@@ -12,22 +1275,130 @@ class CSVProcessor:
         self.encoding = encoding
         self.data = []
         self.headers = []
+        self.table: Optional[ColumnarTable] = None
+        self.indexes: Dict[tuple, Union[HashIndex, SortedIndex]] = {}
+        self._modified = False
+        self.running_stats: Dict[str, ColumnStats] = {}
+        self.running_groups: Dict[str, Counter] = {}
+    
+    @property
+    def index_path(self) -> str:
+        return self.file_path + '.idx'
+    
+    def _file_signature(self) -> Dict[str, Any]:
+        stat = os.stat(self.file_path)
+        return {'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+    
+    def create_index(self, column: str, kind: str = 'hash') -> Union[HashIndex, SortedIndex]:
+        if (kind, column) not in self.indexes:
+            self.indexes[(kind, column)] = INDEX_TYPES[kind](column).build(self.data)
+        return self.indexes[(kind, column)]
+    
+    def drop_index(self, column: str, kind: Optional[str] = None):
+        for key in [key for key in self.indexes if key[1] == column and kind in (None, key[0])]:
+            del self.indexes[key]
+    
+    def _rebuild_indexes(self, column: Optional[str] = None):
+        for (kind, indexed_column), index in self.indexes.items():
+            if column is None or indexed_column == column:
+                index.build(self.data)
+    
+    def _restore_indexes(self, load_file: bool = True) -> int:
+        # After a full read, take what a matching .idx has and rebuild only the rest.
+        loaded = self._read_index_file() if load_file else {}
+        for key, index in self.indexes.items():
+            if key not in loaded:
+                index.build(self.data)
+        self.indexes.update(loaded)
+        return len(loaded)
     
-    def read_csv(self, has_header: bool = True) -> List[Dict[str, Any]]:
+    def lookup(self, column: str, value: Any) -> List[Dict[str, Any]]:
+        return [self.data[i] for i in self.create_index(column, 'hash').lookup(value)]
+    
+    def range_lookup(self, column: str, low: Any = None, high: Any = None,
+                     inclusive: bool = True) -> List[Dict[str, Any]]:
+        positions = self.create_index(column, 'sorted').range(low, high, inclusive)
+        return [self.data[i] for i in positions]
+    
+    def save_indexes(self) -> bool:
+        if self._modified:
+            print("Indexes reflect unsaved in-memory changes; not persisting them")
+            return False
         try:
-            with open(self.file_path, 'r', encoding=self.encoding, newline='') as file:
-                reader = csv.reader(file, delimiter=self.delimiter)
-                
-                if has_header:
-                    self.headers = next(reader)
-                    for row in reader:
-                        if len(row) == len(self.headers):
-                            self.data.append(dict(zip(self.headers, row)))
-                        else:
-                            print(f"Skipping row with mismatched columns: {row}")
-                else:
-                    for i, row in enumerate(reader):
-                        self.data.append({f'column_{j}': value for j, value in enumerate(row)})
+            state = {**self._file_signature(), 'rows': len(self.data),
+                     'indexes': [index.to_dict() for index in self.indexes.values()]}
+            with open(self.index_path, 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+            print(f"Saved {len(self.indexes)} index(es) to {self.index_path}")
+            return True
+        except Exception as e:
+            print(f"Error saving indexes: {e}")
+            return False
+    
+    def _read_index_file(self) -> Dict[tuple, Union[HashIndex, SortedIndex]]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+            signature = {key: state.get(key) for key in ('mtime', 'size')}
+            if signature != self._file_signature() or state.get('rows') != len(self.data):
+                print(f"Index file {self.index_path} is stale; rebuilding indexes")
+                return {}
+            loaded = {}
+            for entry in state['indexes']:
+                index = INDEX_TYPES[entry['kind']].from_dict(entry)
+                loaded[(index.kind, index.column)] = index
+            print(f"Loaded {len(loaded)} index(es) from {self.index_path}")
+            return loaded
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Error loading indexes: {e}")
+            return {}
+    
+    def load_indexes(self) -> bool:
+        # Index positions point into self.data, so the rows have to be read before they can be used.
+        if not self.data:
+            try:
+                self._detach_table()
+                self.data.extend(self.iter_rows())
+            except FileNotFoundError:
+                print(f"Error: File {self.file_path} not found")
+                return False
+        return self._restore_indexes() > 0
+    
+    def iter_rows(self, has_header: bool = True, where: Optional[Expr] = None) -> Iterator[Dict[str, Any]]:
+        with open(self.file_path, 'r', encoding=self.encoding, newline='') as file:
+            reader = csv.reader(file, delimiter=self.delimiter)
+            
+            if has_header:
+                self.headers = next(reader, [])
+                predicate = where.compile(self.headers) if where is not None else None
+                for row in reader:
+                    if len(row) == len(self.headers):
+                        if predicate is None or predicate(row):
+                            yield dict(zip(self.headers, row))
+                    else:
+                        print(f"Skipping row with mismatched columns: {row}")
+            else:
+                predicate = where.compile() if where is not None else None
+                for row in reader:
+                    row = {f'column_{j}': value for j, value in enumerate(row)}
+                    if predicate is None or predicate(row):
+                        yield row
+    
+    def stream(self, has_header: bool = True, where: Optional[Expr] = None) -> RowStream:
+        return RowStream(lambda: self.iter_rows(has_header, where))
+    
+    def read_csv(self, has_header: bool = True, columnar: bool = False) -> List[Dict[str, Any]]:
+        whole_file = columnar or not self.data
+        try:
+            if columnar:
+                self.table = ColumnarTable.from_rows(self.iter_rows(has_header), self.headers or None,
+                                                     parse_text=True)
+                self.data = self.table.rows()
+            else:
+                self._detach_table()
+                self.data.extend(self.iter_rows(has_header))
             
             print(f"Loaded {len(self.data)} rows from {self.file_path}")
             return self.data
@@ -38,45 +1409,266 @@ class CSVProcessor:
         except Exception as e:
             print(f"Error reading CSV: {e}")
             return []
+        finally:
+            self._restore_indexes(whole_file and has_header)
+    
+    def _detach_table(self):
+        # Row-mode loads append to self.data, so a columnar view has to become a plain list first.
+        if self.table is not None:
+            self.data = list(self.data)
+            self.table = None
+    
+    def _read_header(self) -> int:
+        with open(self.file_path, 'rb') as file:
+            header_bytes = b''
+            for line in file:
+                header_bytes += line
+                if not header_bytes.count(b'"') & 1:
+                    break
+        header_text = header_bytes.decode(self.encoding)
+        self.headers = next(csv.reader(io.StringIO(header_text, newline=''), delimiter=self.delimiter), [])
+        return len(header_bytes)
+    
+    def _iter_payloads_parallel(self, has_header: bool, workers: Optional[int], chunk_size: int,
+                                ordered: bool) -> Iterator[List[Any]]:
+        start = self._read_header() if has_header else 0
+        headers = self.headers if has_header else None
+        boundaries = find_record_boundaries(self.file_path, chunk_size, start)
+        ranges = [(lo, hi) for lo, hi in zip(boundaries, boundaries[1:]) if hi > lo]
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_parse_chunk, self.file_path, lo, hi, self.encoding,
+                                       self.delimiter, headers) for lo, hi in ranges]
+            for future in (futures if ordered else as_completed(futures)):
+                yield future.result()
+    
+    def iter_chunks_parallel(self, has_header: bool = True, workers: Optional[int] = None,
+                             chunk_size: int = 16 * 1024 * 1024,
+                             ordered: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        for payload in self._iter_payloads_parallel(has_header, workers, chunk_size, ordered):
+            if has_header:
+                yield [dict(zip(self.headers, values)) for values in zip(*payload)]
+            else:
+                keys = [f'column_{j}' for j in range(max(map(len, payload), default=0))]
+                yield [dict(zip(keys, row)) for row in payload]
+    
+    def _read_table_parallel(self, workers: Optional[int], chunk_size: int) -> ColumnarTable:
+        # Chunks arrive as columns, so they are concatenated straight into the table and rows
+        # only become dicts when TableRows hands them out.
+        columns = None
+        for payload in self._iter_payloads_parallel(True, workers, chunk_size, True):
+            if columns is None:
+                columns = [[] for _ in self.headers]
+            for values, chunk in zip(columns, payload):
+                values.extend(chunk)
+        if columns is None:
+            return ColumnarTable({})
+        return ColumnarTable({name: Column.from_values(values, parse_text=True)
+                              for name, values in zip(self.headers, columns)})
+    
+    def read_csv_parallel(self, has_header: bool = True, workers: Optional[int] = None,
+                          chunk_size: int = 16 * 1024 * 1024, columnar: bool = False) -> List[Dict[str, Any]]:
+        whole_file = columnar or not self.data
+        try:
+            started = time.perf_counter()
+            if columnar and has_header:
+                self.table = self._read_table_parallel(workers, chunk_size)
+                self.data = self.table.rows()
+            elif columnar:
+                chunks = self.iter_chunks_parallel(has_header, workers, chunk_size)
+                self.table = ColumnarTable.from_rows((row for chunk in chunks for row in chunk), parse_text=True)
+                self.data = self.table.rows()
+            else:
+                self._detach_table()
+                for chunk in self.iter_chunks_parallel(has_header, workers, chunk_size):
+                    self.data.extend(chunk)
+            elapsed = time.perf_counter() - started
+            
+            rate = len(self.data) / elapsed if elapsed else float('inf')
+            print(f"Loaded {len(self.data)} rows from {self.file_path} ({rate:,.0f} rows/sec)")
+            return self.data
+            
+        except FileNotFoundError:
+            print(f"Error: File {self.file_path} not found")
+            return []
+        except Exception as e:
+            print(f"Error reading CSV: {e}")
+            return []
+        finally:
+            self._restore_indexes(whole_file and has_header)
+    
+    def _load_checkpoint(self, checkpoint_path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(checkpoint_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading checkpoint: {e}")
+            return None
+    
+    def _checkpoint_is_valid(self, state: Dict[str, Any], file, header: str,
+                             stats_columns: List[str], group_columns: List[str]) -> bool:
+        stat = os.fstat(file.fileno())
+        if (state.get('inode') != stat.st_ino or stat.st_size < state['offset']
+                or state.get('header') != header
+                or sorted(state['stats']) != sorted(stats_columns)
+                or sorted(state['groups']) != sorted(group_columns)):
+            return False
+        tail_start = max(state['offset'] - 64, 0)
+        file.seek(tail_start)
+        return hashlib.sha1(file.read(state['offset'] - tail_start)).hexdigest() == state['tail']
     
-    def write_csv(self, data: List[Dict[str, Any]], output_path: Optional[str] = None):
-        if not data:
+    def process_incremental(self, stats_columns: Iterable[str] = (), group_columns: Iterable[str] = (),
+                            checkpoint_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        stats_columns, group_columns = list(stats_columns), list(group_columns)
+        checkpoint_path = checkpoint_path or self.file_path + '.checkpoint'
+        state = self._load_checkpoint(checkpoint_path)
+        
+        try:
+            header_end = self._read_header()
+            with open(self.file_path, 'rb') as file:
+                header = hashlib.sha1(file.read(header_end)).hexdigest()
+                if state is None or not self._checkpoint_is_valid(state, file, header, stats_columns,
+                                                                  group_columns):
+                    if state is not None:
+                        print(f"Checkpoint for {self.file_path} no longer matches the file; rescanning")
+                    state = {'offset': header_end, 'rows': 0,
+                             'stats': {column: ColumnStats().to_state() for column in stats_columns},
+                             'groups': {column: [] for column in group_columns}}
+                
+                self.running_stats = {column: ColumnStats.from_state(stats)
+                                      for column, stats in state['stats'].items()}
+                self.running_groups = {column: Counter(dict(counts))
+                                       for column, counts in state['groups'].items()}
+                
+                new_rows = []
+                offset = state['offset']
+                file.seek(offset)
+                record = b''
+                for line in file:
+                    record += line
+                    if not line.endswith(b'\n') or record.count(b'"') & 1:
+                        continue
+                    
+                    values = next(csv.reader(io.StringIO(record.decode(self.encoding), newline=''),
+                                             delimiter=self.delimiter), [])
+                    offset += len(record)
+                    record = b''
+                    if len(values) != len(self.headers):
+                        print(f"Skipping row with mismatched columns: {values}")
+                        continue
+                    
+                    row = dict(zip(self.headers, values))
+                    for column, stats in self.running_stats.items():
+                        try:
+                            stats.add(float(row.get(column)))
+                        except (TypeError, ValueError):
+                            pass
+                    for column, counts in self.running_groups.items():
+                        counts[row.get(column)] += 1
+                    new_rows.append(row)
+                
+                tail_start = max(offset - 64, 0)
+                file.seek(tail_start)
+                tail = hashlib.sha1(file.read(offset - tail_start)).hexdigest()
+                inode = os.fstat(file.fileno()).st_ino
+            
+            state = {'offset': offset, 'rows': state['rows'] + len(new_rows), 'inode': inode,
+                     'header': header, 'tail': tail,
+                     'stats': {column: stats.to_state() for column, stats in self.running_stats.items()},
+                     'groups': {column: list(counts.items())
+                                for column, counts in self.running_groups.items()}}
+            with open(checkpoint_path, 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+            
+            print(f"Processed {len(new_rows)} new rows from {self.file_path} ({state['rows']} total)")
+            return new_rows
+            
+        except FileNotFoundError:
+            print(f"Error: File {self.file_path} not found")
+            return []
+        except Exception as e:
+            print(f"Error processing CSV incrementally: {e}")
+            return []
+    
+    def get_running_stats(self, column: str) -> Dict[str, Any]:
+        return self.running_stats.get(column, ColumnStats()).to_dict()
+    
+    def get_running_group_counts(self, column: str) -> Dict[Any, int]:
+        return dict(self.running_groups.get(column, {}))
+    
+    def write_csv(self, data: Iterable[Dict[str, Any]], output_path: Optional[str] = None):
+        rows = iter(data)
+        first_row = next(rows, None)
+        if first_row is None:
             print("No data to write")
             return
         
         if output_path is None:
             output_path = self.file_path
         
-        if not data:
-            return
-        
-        fieldnames = data[0].keys()
+        fieldnames = first_row.keys()
         
         try:
             with open(output_path, 'w', encoding=self.encoding, newline='') as file:
                 writer = csv.DictWriter(file, fieldnames=fieldnames, delimiter=self.delimiter)
                 writer.writeheader()
-                writer.writerows(data)
+                writer.writerow(first_row)
+                count = 1
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
             
-            print(f"Written {len(data)} rows to {output_path}")
+            print(f"Written {count} rows to {output_path}")
             
         except Exception as e:
             print(f"Error writing CSV: {e}")
     
     def filter_rows(self, condition) -> List[Dict[str, Any]]:
+        if isinstance(condition, Expr):
+            if self.table is not None:
+                return list(self.table.where(condition).rows())
+            condition = condition.compile()
         return [row for row in self.data if condition(row)]
     
-    def sort_by_column(self, column: str, reverse: bool = False) -> List[Dict[str, Any]]:
+    def filter_column(self, column: str, predicate) -> List[Dict[str, Any]]:
+        if self.table is not None and column in self.table.columns:
+            return list(self.table.filter(column, predicate).rows())
+        return [row for row in self.data if predicate(row.get(column))]
+    
+    def sort_by_column(self, column: Union[str, List[str]], reverse: Union[bool, List[bool]] = False,
+                       types: Optional[Dict[str, str]] = None, collation=None,
+                       date_format: str = '%Y-%m-%d',
+                       max_rows_in_memory: int = 1000000) -> List[Dict[str, Any]]:
+        columns = _join_columns(column)
+        if self.table is not None and len(columns) == 1 and columns[0] in self.table.columns:
+            descending = reverse[0] if isinstance(reverse, list) else reverse
+            return list(self.table.sort(columns[0], descending, types, collation, date_format).rows())
         try:
-            return sorted(self.data, key=lambda x: x.get(column, ''), reverse=reverse)
+            return RowStream(lambda: self.data).sort(column, reverse, types, collation, date_format,
+                                                     max_rows_in_memory).collect()
         except Exception as e:
             print(f"Error sorting: {e}")
             return self.data
     
+    def top_k(self, column: Union[str, List[str]], k: int, reverse: Union[bool, List[bool]] = True,
+              types: Optional[Dict[str, str]] = None, collation=None,
+              date_format: str = '%Y-%m-%d') -> List[Dict[str, Any]]:
+        return RowStream(lambda: self.data).top_k(column, k, reverse, types, collation, date_format)
+    
     def get_unique_values(self, column: str) -> List[Any]:
+        if self.table is not None and column in self.table.columns:
+            return [value for value in set(self.table.columns[column]) if value is not None]
         return list(set(row.get(column) for row in self.data if row.get(column) is not None))
     
     def group_by_column(self, column: str) -> Dict[Any, List[Dict[str, Any]]]:
+        if self.table is not None and column in self.table.columns:
+            return {key: list(self.table.take(indices).rows())
+                    for key, indices in self.table.group_indices(column).items()}
+        if ('hash', column) in self.indexes:
+            return {key: [self.data[i] for i in positions]
+                    for key, positions in self.indexes[('hash', column)].positions.items()}
         groups = {}
         for row in self.data:
             key = row.get(column)
@@ -85,78 +1677,67 @@ class CSVProcessor:
             groups[key].append(row)
         return groups
     
-    def get_column_stats(self, column: str) -> Dict[str, Any]:
-        values = []
-        for row in self.data:
-            value = row.get(column)
-            if value is not None:
-                try:
-                    values.append(float(value))
-                except ValueError:
-                    pass
-        
-        if not values:
-            return {"error": "No numeric values found"}
-        
-        return {
-            "count": len(values),
-            "mean": statistics.mean(values),
-            "median": statistics.median(values),
-            "mode": statistics.mode(values) if len(set(values)) < len(values) else None,
-            "min": min(values),
-            "max": max(values),
-            "sum": sum(values),
-            "std_dev": statistics.stdev(values) if len(values) > 1 else 0
-        }
+    def group_by(self, columns: Union[str, List[str]], max_groups: int = 100000,
+                 partitions: int = 16, exact: bool = False) -> GroupBy:
+        return GroupBy(self.data, columns, max_groups, partitions, exact)
+    
+    def get_column_stats(self, column: str, exact: bool = False) -> Dict[str, Any]:
+        max_distinct = None if exact else 10000
+        if self.table is not None and column in self.table.columns:
+            return self.table.column_stats(column, max_distinct).to_dict()
+        return _collect_column_stats(self.data, column, max_distinct).to_dict()
     
     def add_column(self, column_name: str, default_value: Any = None):
-        for row in self.data:
-            row[column_name] = default_value
+        if self.table is not None:
+            self.table.columns[column_name] = Column.from_values(default_value for _ in range(len(self.table)))
+        else:
+            for row in self.data:
+                row[column_name] = default_value
+        self._modified = True
+        self._rebuild_indexes(column_name)
     
     def update_column(self, column: str, update_func):
-        for row in self.data:
-            if column in row:
-                row[column] = update_func(row[column])
+        if self.table is not None:
+            if column in self.table.columns:
+                self.table.columns[column] = self.table.columns[column].map(update_func)
+        else:
+            for row in self.data:
+                if column in row:
+                    row[column] = update_func(row[column])
+        self._modified = True
+        self._rebuild_indexes(column)
     
     def delete_column(self, column: str):
-        for row in self.data:
-            if column in row:
-                del row[column]
+        if self.table is not None:
+            self.table.columns.pop(column, None)
+        else:
+            for row in self.data:
+                if column in row:
+                    del row[column]
+        self._modified = True
+        self.drop_index(column)
     
-    def merge_csv(self, other_csv: 'CSVProcessor', on_column: str, how: str = 'inner') -> List[Dict[str, Any]]:
-        other_data = other_csv.data
+    def merge_csv(self, other_csv: 'CSVProcessor', on_column: Union[str, List[str]], how: str = 'inner',
+                  strategy: str = 'auto', max_rows_in_memory: int = 1000000) -> List[Dict[str, Any]]:
+        if how not in JOIN_TYPES:
+            print(f"Unsupported join type: {how}")
+            return self.data
         
-        if how == 'inner':
-            merged = []
-            for row1 in self.data:
-                for row2 in other_data:
-                    if row1.get(on_column) == row2.get(on_column):
-                        merged_row = {**row1, **row2}
-                        merged.append(merged_row)
-            return merged
+        other_data = other_csv.data
+        if strategy == 'auto':
+            smaller = min(len(self.data), len(other_data))
+            strategy = 'hash' if smaller <= max_rows_in_memory else 'sort_merge'
         
-        elif how == 'left':
-            merged = []
-            for row1 in self.data:
-                matching_row = None
-                for row2 in other_data:
-                    if row1.get(on_column) == row2.get(on_column):
-                        matching_row = row2
-                        break
-                
-                if matching_row:
-                    merged_row = {**row1, **matching_row}
-                else:
-                    merged_row = row1.copy()
-                merged.append(merged_row)
-            return merged
+        if strategy == 'sort_merge':
+            return list(sort_merge_join(self.data, other_data, on_column, how, max_rows_in_memory))
         
-        return self.data
+        build_left = how == 'inner' and len(self.data) < len(other_data)
+        return list(hash_join(self.data, other_data, on_column, how, build_left))
     
-    def to_json(self, output_path: str):
+    def to_json(self, output_path: str, indent: Optional[int] = 2):
         try:
             with open(output_path, 'w', encoding=self.encoding) as file:
-                json.dump(self.data, file, indent=2, ensure_ascii=False)
+                codec.dump(list(self.data), file, indent=indent)
             print(f"Data exported to JSON: {output_path}")
         except Exception as e:
             print(f"Error exporting to JSON: {e}")
@@ -164,7 +1745,9 @@ class CSVProcessor:
     def from_json(self, json_path: str):
         try:
             with open(json_path, 'r', encoding=self.encoding) as file:
-                self.data = json.load(file)
+                self.data = codec.load(file)
+            self.table = None
+            self.indexes = {}
             
             if self.data:
                 self.headers = list(self.data[0].keys())
@@ -172,6 +1755,90 @@ class CSVProcessor:
             print(f"Loaded {len(self.data)} rows from JSON: {json_path}")
         except Exception as e:
             print(f"Error loading from JSON: {e}")
+    
+    def to_ndjson(self, output_path: str, data: Optional[Iterable[Dict[str, Any]]] = None):
+        try:
+            count = 0
+            with open(output_path, 'w', encoding=self.encoding) as file:
+                for row in (self.data if data is None else data):
+                    file.write(codec.dumps(row))
+                    file.write('\n')
+                    count += 1
+            print(f"Data exported to NDJSON: {output_path} ({count} rows)")
+        except Exception as e:
+            print(f"Error exporting to NDJSON: {e}")
+    
+    def iter_ndjson(self, ndjson_path: str) -> Iterator[Dict[str, Any]]:
+        with open(ndjson_path, 'r', encoding=self.encoding) as file:
+            for line in file:
+                if line.strip():
+                    yield codec.loads(line)
+    
+    def from_ndjson(self, ndjson_path: str):
+        try:
+            self.data = list(self.iter_ndjson(ndjson_path))
+            self.table = None
+            self.indexes = {}
+            
+            if self.data:
+                self.headers = list(self.data[0].keys())
+            
+            print(f"Loaded {len(self.data)} rows from NDJSON: {ndjson_path}")
+        except Exception as e:
+            print(f"Error loading from NDJSON: {e}")
+    
+    def _as_table(self) -> ColumnarTable:
+        if self.table is not None:
+            return self.table
+        # Row-mode values are written with the types they already have; numeric-looking
+        # strings (zip codes, IDs with leading zeros) are not reinterpreted on export.
+        return ColumnarTable.from_rows(self.data, self.headers or None, parse_text=False)
+    
+    def to_columnar(self, output_path: str, use_arrow: Optional[bool] = None):
+        use_arrow = pyarrow is not None if use_arrow is None else use_arrow
+        if use_arrow and pyarrow is None:
+            print("pyarrow is not installed; writing the built-in columnar format instead")
+            use_arrow = False
+        
+        try:
+            table = self._as_table()
+            if use_arrow:
+                arrow_table = pyarrow.table({name: list(column) for name, column in table.columns.items()})
+                pyarrow.parquet.write_table(arrow_table, output_path)
+            else:
+                _write_native_columnar(table, output_path)
+            print(f"Data exported to columnar file: {output_path} ({len(table)} rows)")
+        except Exception as e:
+            print(f"Error exporting to columnar format: {e}")
+    
+    def from_columnar(self, input_path: str):
+        try:
+            with open(input_path, 'rb') as file:
+                magic = file.read(len(COLUMNAR_MAGIC))
+            if magic.startswith(PARQUET_MAGIC):
+                arrow_table = pyarrow.parquet.read_table(input_path, memory_map=True)
+                self.table = ColumnarTable({name: Column.from_values(arrow_table.column(name).to_pylist())
+                                            for name in arrow_table.column_names})
+            else:
+                self.table = ColumnarTable(_read_native_columnar(input_path))
+            self.data = self.table.rows()
+            self.headers = list(self.table.columns)
+            self.indexes = {}
+            print(f"Loaded {len(self.data)} rows from columnar file: {input_path}")
+        except Exception as e:
+            print(f"Error loading from columnar format: {e}")
+    
+    def read_column(self, input_path: str, column: str) -> Optional[Column]:
+        try:
+            with open(input_path, 'rb') as file:
+                magic = file.read(len(COLUMNAR_MAGIC))
+            if magic.startswith(PARQUET_MAGIC):
+                arrow_table = pyarrow.parquet.read_table(input_path, columns=[column], memory_map=True)
+                return Column.from_values(arrow_table.column(column).to_pylist())
+            return _read_native_columnar(input_path, [column])[column]
+        except Exception as e:
+            print(f"Error reading column {column}: {e}")
+            return None
 
 def create_sample_csv():
     sample_data = [
@@ -201,7 +1868,7 @@ def main():
     print(f"First 3 rows: {data[:3]}")
     
     print("\n2. Filtering data:")
-    high_earners = processor.filter_rows(lambda x: float(x.get('salary', 0)) > 70000)
+    high_earners = processor.filter_rows(col('salary') > 70000)
     print(f"High earners (>70000): {len(high_earners)}")
     for person in high_earners:
         print(f"  {person['name']}: ${person['salary']}")
@@ -259,6 +1926,14 @@ def main():
     
     processor.write_csv(merged_data, 'merged_data.csv')
     
+    print("\n9. Streaming rows in constant memory:")
+    streamed = CSVProcessor('sample_data.csv').stream()
+    big_salaries = CSVProcessor('sample_data.csv').stream(where=col('salary') > 70000)
+    print(f"High earners (streamed): {big_salaries.count()}")
+    print(f"Streamed salary mean: {streamed.column_stats('salary')['mean']}")
+    first_rows = streamed.map(lambda x: {'name': x['name'], 'city': x['city']}).limit(3).collect()
+    print(f"First streamed rows: {first_rows}")
+    
     print("\nCSV processing completed!")
 
 if __name__ == "__main__":
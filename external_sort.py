@@ -0,0 +1,41 @@
+import heapq
+import pickle
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List
+
+def spill_run(rows: List[Dict[str, Any]]):
+    run = tempfile.TemporaryFile()
+    for row in rows:
+        pickle.dump(row, run, pickle.HIGHEST_PROTOCOL)
+    run.seek(0)
+    return run
+
+def read_run(run) -> Iterator[Dict[str, Any]]:
+    try:
+        while True:
+            try:
+                yield pickle.load(run)
+            except EOFError:
+                return
+    finally:
+        run.close()
+
+def external_sort(rows: Iterable[Dict[str, Any]], key, reverse: bool = False,
+                  max_rows_in_memory: int = 100000) -> Iterator[Dict[str, Any]]:
+    runs = []
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= max_rows_in_memory:
+            chunk.sort(key=key, reverse=reverse)
+            runs.append(spill_run(chunk))
+            chunk = []
+    chunk.sort(key=key, reverse=reverse)
+    
+    if not runs:
+        yield from chunk
+        return
+    
+    if chunk:
+        runs.append(spill_run(chunk))
+    yield from heapq.merge(*(read_run(run) for run in runs), key=key, reverse=reverse)
@@ -0,0 +1,178 @@
+import json
+import math
+import os
+from typing import Any, Dict, Optional, TextIO, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class StdlibCodec:
+    name = 'json'
+
+    def supports(self, indent: Optional[int], ensure_ascii: bool, sort_keys: bool) -> bool:
+        return True
+
+    def encode(self, obj: Any, indent: Optional[int], ensure_ascii: bool, sort_keys: bool) -> bytes:
+        separators = (',', ':') if indent is None else None
+        return json.dumps(obj, indent=indent, ensure_ascii=ensure_ascii, sort_keys=sort_keys,
+                          separators=separators).encode('utf-8')
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(StdlibCodec):
+    name = 'orjson'
+
+    def supports(self, indent: Optional[int], ensure_ascii: bool, sort_keys: bool) -> bool:
+        return indent in (None, 2) and not ensure_ascii
+
+    def encode(self, obj: Any, indent: Optional[int], ensure_ascii: bool, sort_keys: bool) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+
+class UjsonCodec(StdlibCodec):
+    name = 'ujson'
+
+    def encode(self, obj: Any, indent: Optional[int], ensure_ascii: bool, sort_keys: bool) -> bytes:
+        text = ujson.dumps(obj, indent=indent or 0, ensure_ascii=ensure_ascii, sort_keys=sort_keys,
+                           escape_forward_slashes=False)
+        return text.encode('utf-8')
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        return ujson.loads(data)
+
+
+class MsgspecCodec(StdlibCodec):
+    name = 'msgspec'
+
+    def __init__(self):
+        self.encoder = msgspec.json.Encoder()
+        self.decoder = msgspec.json.Decoder()
+
+    def supports(self, indent: Optional[int], ensure_ascii: bool, sort_keys: bool) -> bool:
+        return not ensure_ascii and not sort_keys
+
+    def encode(self, obj: Any, indent: Optional[int], ensure_ascii: bool, sort_keys: bool) -> bytes:
+        data = self.encoder.encode(obj)
+        return msgspec.json.format(data, indent=indent) if indent else data
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        return self.decoder.decode(data)
+
+
+# Integers with 19+ digits may not fit in 64 bits; the fast backends either reject them
+# or silently turn them into floats. Mapping every digit to '0' and everything else to ' '
+# lets a plain substring search find such runs at C speed.
+DIGIT_MASK = bytes(ord('0') if chr(byte).isdigit() and byte < 128 else ord(' ') for byte in range(256))
+BIG_INTEGER_RUN = b'0' * 19
+
+def _has_big_integer(data: Union[str, bytes, bytearray]) -> bool:
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return BIG_INTEGER_RUN in data.translate(DIGIT_MASK)
+
+def _has_non_finite(obj: Any) -> bool:
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(value) for value in obj)
+    return False
+
+
+BACKENDS = [
+    ('orjson', orjson, OrjsonCodec),
+    ('msgspec', msgspec, MsgspecCodec),
+    ('ujson', ujson, UjsonCodec),
+    ('json', json, StdlibCodec),
+]
+
+
+def available_backends() -> Dict[str, StdlibCodec]:
+    return {name: factory() for name, module, factory in BACKENDS if module is not None}
+
+
+class JSONCodec:
+    def __init__(self, backend: Optional[str] = None, strict: bool = False):
+        # strict makes a fast backend match the stdlib for integers beyond 64 bits and for
+        # NaN/Infinity, at the cost of an extra scan per call; it is off by default.
+        self.strict = strict
+        backends = available_backends()
+        backend = backend or os.getenv('JSON_CODEC')
+        if backend is not None and backend not in backends:
+            print(f"JSON backend {backend} is not available; falling back to the fastest installed one")
+            backend = None
+        self.backend = backends[backend] if backend else next(iter(backends.values()))
+        self.fallback = backends['json']
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    def _encoder(self, indent: Optional[int], ensure_ascii: bool, sort_keys: bool) -> StdlibCodec:
+        if self.backend.supports(indent, ensure_ascii, sort_keys):
+            return self.backend
+        return self.fallback
+
+    def dumpb(self, obj: Any, indent: Optional[int] = None, ensure_ascii: bool = False,
+              sort_keys: bool = False) -> bytes:
+        encoder = self._encoder(indent, ensure_ascii, sort_keys)
+        if encoder is not self.fallback:
+            # Anything a fast backend refuses (big integers, unusual keys) is encoded by the
+            # stdlib instead; in strict mode so is NaN/Infinity, which the backend writes as null.
+            try:
+                data = encoder.encode(obj, indent, ensure_ascii, sort_keys)
+                if not (self.strict and b'null' in data and _has_non_finite(obj)):
+                    return data
+            except (TypeError, ValueError, OverflowError):
+                pass
+        return self.fallback.encode(obj, indent, ensure_ascii, sort_keys)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None, ensure_ascii: bool = False,
+              sort_keys: bool = False) -> str:
+        return self.dumpb(obj, indent, ensure_ascii, sort_keys).decode('utf-8')
+
+    def loads(self, data: Union[str, bytes, bytearray, memoryview]) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        if self.backend is not self.fallback and not (self.strict and _has_big_integer(data)):
+            try:
+                return self.backend.decode(data)
+            except (ValueError, TypeError):
+                # Retry with the stdlib, which also accepts NaN/Infinity and reports
+                # errors as JSONDecodeError.
+                pass
+        return self.fallback.decode(data)
+
+    def dump(self, obj: Any, file: TextIO, indent: Optional[int] = None, ensure_ascii: bool = False,
+             sort_keys: bool = False):
+        file.write(self.dumps(obj, indent, ensure_ascii, sort_keys))
+
+    def load(self, file: TextIO) -> Any:
+        return self.loads(file.read())
+
+
+codec = JSONCodec()
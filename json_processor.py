@@ -1,16 +1,765 @@
 import json
+import mmap
 import os
-from typing import Dict, List, Any, Union
+import re
+import struct
+import sys
+import tempfile
+import threading
+import types
+import typing
+from contextlib import contextmanager
+from array import array
+from dataclasses import dataclass, fields, is_dataclass, MISSING as NO_DEFAULT
+from functools import lru_cache, reduce
+from itertools import chain, groupby
+from typing import Dict, List, Any, Union, Iterator, Iterable, Optional, TextIO
+from json_codec import codec
+from external_sort import external_sort
 
-class JSONProcessor:
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+WHITESPACE = ' \t\n\r'
+SCALAR_END = ',]}:' + WHITESPACE
+STRING_SPECIAL = re.compile(r'["\\]')
+STRUCTURAL = re.compile(r'["\[\]{}]')
+
+class JSONStreamReader:
+    def __init__(self, file: TextIO, chunk_size: int = 64 * 1024):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self.mark = None
+    
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        # While a value is being scanned (mark is set) its start is kept, and reads grow with
+        # the buffer so that refilling a large value stays linear.
+        keep = self.pos if self.mark is None else self.mark
+        size = self.chunk_size if self.mark is None else max(self.chunk_size, len(self.buffer) - keep)
+        chunk = self.file.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[keep:] + chunk
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark = 0
+        return True
+    
+    def _peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+    
+    def _next_char(self) -> str:
+        char = self._peek()
+        self.pos += 1
+        return char
+    
+    def _expect(self, expected: str):
+        char = self._next_char()
+        if char != expected:
+            raise json.JSONDecodeError(f"Expected {expected!r}, found {char!r}", self.buffer, self.pos - 1)
+    
+    def _scalar_end(self) -> int:
+        end = self.pos
+        while True:
+            while end < len(self.buffer) and self.buffer[end] not in SCALAR_END:
+                end += 1
+            if end < len(self.buffer):
+                return end
+            offset = end - self.pos
+            if not self._fill():
+                return len(self.buffer)
+            end = self.pos + offset
+    
+    def decode_value(self) -> Any:
+        char = self._peek()
+        if char not in '"[{':
+            end = self._scalar_end()
+            value = json.loads(self.buffer[self.pos:end])
+            self.pos = end
+            return value
+        # Find where the value ends first, then decode it in a single pass.
+        self.mark = self.pos
+        try:
+            self.skip_value()
+            start = self.mark
+        finally:
+            self.mark = None
+        value, self.pos = self.decoder.raw_decode(self.buffer, start)
+        return value
+    
+    def _skip_string(self):
+        self.pos += 1
+        while True:
+            match = STRING_SPECIAL.search(self.buffer, self.pos)
+            if match is not None:
+                if match.group() == '"':
+                    self.pos = match.end()
+                    return
+                if match.end() < len(self.buffer):
+                    self.pos = match.end() + 1
+                    continue
+                self.pos = match.start()
+            else:
+                self.pos = len(self.buffer)
+            if not self._fill():
+                raise json.JSONDecodeError("Unterminated string", self.buffer, self.pos)
+    
+    def skip_value(self):
+        char = self._peek()
+        if char == '"':
+            self._skip_string()
+            return
+        if char not in '[{':
+            self.pos = self._scalar_end()
+            return
+        depth = 0
+        while True:
+            match = STRUCTURAL.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    raise json.JSONDecodeError("Unexpected end of data", self.buffer, self.pos)
+                continue
+            char = match.group()
+            if char == '"':
+                self.pos = match.start()
+                self._skip_string()
+                continue
+            self.pos = match.end()
+            if char in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+    
+    def _iter_container(self) -> Iterator[Optional[str]]:
+        opening = self._next_char()
+        closing = {'[': ']', '{': '}'}.get(opening)
+        if closing is None:
+            raise json.JSONDecodeError(f"Expected array or object, found {opening!r}", self.buffer, self.pos - 1)
+        index = 0
+        if self._peek() == closing:
+            self.pos += 1
+            return
+        while True:
+            if opening == '{':
+                key = self.decode_value()
+                self._expect(':')
+                yield key
+            else:
+                yield str(index)
+            index += 1
+            char = self._next_char()
+            if char == closing:
+                return
+            if char != ',':
+                raise json.JSONDecodeError(f"Expected ',' or {closing!r}, found {char!r}", self.buffer, self.pos - 1)
+    
+    def iter_path(self, segments: List[str]) -> Iterator[Any]:
+        if not segments:
+            yield self.decode_value()
+            return
+        if self._peek() not in '[{':
+            self.skip_value()
+            return
+        segment, rest = segments[0], segments[1:]
+        for key in self._iter_container():
+            if segment == '*' or segment == key:
+                yield from self.iter_path(rest)
+            else:
+                self.skip_value()
+
+def parse_path(path: Optional[str]) -> List[str]:
+    return [segment for segment in (path or '*').split('.') if segment]
+
+def to_pointer(keys: List[str]) -> str:
+    return ''.join('/' + key.replace('~', '~0').replace('/', '~1') for key in keys)
+
+def from_pointer(pointer: str) -> List[str]:
+    return [key.replace('~1', '/').replace('~0', '~') for key in pointer.split('/')[1:]]
+
+MISSING = object()
+
+def _parse_segment(segment: str):
+    # (kind, parsed argument, raw segment). Dicts are always looked up by the raw segment,
+    # so keys such as '01' or '10:30' keep working; index/slice only apply to lists.
+    if segment == '*':
+        return ('wildcard', None, segment)
+    if ':' in segment:
+        parts = segment.split(':')
+        if len(parts) <= 3 and all(part.lstrip('-').isdigit() or part == '' for part in parts):
+            return ('slice', slice(*(int(part) if part else None for part in parts)), segment)
+    if segment.lstrip('-').isdigit():
+        return ('index', int(segment), segment)
+    return ('key', segment, segment)
+
+class CompiledPath:
+    def __init__(self, segments: List[tuple], source: str = ''):
+        self.segments = segments
+        self.source = source
+        self.is_multi = any(kind in ('wildcard', 'slice') for kind, _, _ in segments)
+    
+    @classmethod
+    def from_keys(cls, keys: List[str]) -> 'CompiledPath':
+        return cls([_parse_segment(key) for key in keys], '.'.join(keys))
+    
+    @property
+    def keys(self) -> List[str]:
+        return [raw for _, _, raw in self.segments]
+    
+    @staticmethod
+    def _step(current: Any, kind: str, arg: Any, raw: str) -> Any:
+        if isinstance(current, dict):
+            return current.get(raw, MISSING)
+        if kind == 'key' and is_dataclass(current):
+            return getattr(current, arg, MISSING)
+        if isinstance(current, list) and kind == 'index' and -len(current) <= arg < len(current):
+            return current[arg]
+        return MISSING
+    
+    def _expand(self, current: Any, kind: str, arg: Any, raw: str) -> List[Any]:
+        if kind == 'wildcard':
+            if isinstance(current, dict):
+                return list(current.values())
+            return list(current) if isinstance(current, list) else []
+        if kind == 'slice' and isinstance(current, list):
+            return current[arg]
+        value = self._step(current, kind, arg, raw)
+        return [] if value is MISSING else [value]
+    
+    def get(self, data: Any, default: Any = None) -> Any:
+        if self.is_multi:
+            matches = [data]
+            expanded = False
+            for segment in self.segments:
+                kind = segment[0]
+                expanded = expanded or kind == 'wildcard' or (
+                    kind == 'slice' and any(isinstance(match, list) for match in matches))
+                matches = [value for match in matches for value in self._expand(match, *segment)]
+            if not expanded:
+                # A slice-like segment that only ever hit dict keys ('10:30') is a plain lookup.
+                return matches[0] if matches else default
+            return matches
+        
+        current = data
+        for segment in self.segments:
+            current = self._step(current, *segment)
+            if current is MISSING:
+                return default
+        return current
+    
+    def set(self, data: Any, value: Any):
+        if not self.segments or any(kind == 'wildcard' for kind, _, _ in self.segments):
+            raise ValueError(f"Cannot assign through path '{self.source}'")
+        current = data
+        for segment in self.segments[:-1]:
+            if segment[0] == 'slice' and isinstance(current, list):
+                raise ValueError(f"Cannot assign through path '{self.source}'")
+            child = self._step(current, *segment)
+            if child is MISSING:
+                if not isinstance(current, dict):
+                    raise KeyError(f"Path '{self.source}' does not exist")
+                child = current[segment[2]] = {}
+            current = child
+        kind, arg, raw = self.segments[-1]
+        if isinstance(current, list) and kind == 'slice':
+            raise ValueError(f"Cannot assign through path '{self.source}'")
+        if isinstance(current, list) and kind == 'index':
+            current[arg] = value
+        elif isinstance(current, dict):
+            current[raw] = value
+        elif kind == 'key' and is_dataclass(current) and hasattr(current, arg):
+            setattr(current, arg, value)
+        else:
+            raise KeyError(f"Path '{self.source}' does not exist")
+
+@lru_cache(maxsize=1024)
+def compile_path(key_path: str) -> CompiledPath:
+    return CompiledPath([_parse_segment(segment) for segment in key_path.split('.') if segment], key_path)
+
+def assign_path(data: Any, keys: List[str], value: Any):
+    CompiledPath.from_keys(keys).set(data, value)
+
+def get_many(data: Any, key_paths: List[str], default: Any = None) -> Dict[str, Any]:
+    results = {}
+    trie: Dict[Any, Any] = {}
+    for key_path in key_paths:
+        path = compile_path(key_path)
+        if path.is_multi:
+            results[key_path] = path.get(data, default)
+            continue
+        node = trie
+        for segment in path.segments:
+            node = node.setdefault(segment, {})
+        node.setdefault(None, []).append(key_path)
+    
+    def visit(node: Dict[Any, Any], current: Any):
+        for segment, child in node.items():
+            if segment is None:
+                for key_path in child:
+                    results[key_path] = current
+                continue
+            value = CompiledPath._step(current, *segment)
+            if value is MISSING:
+                for missing in _trie_paths(child):
+                    results[missing] = default
+            else:
+                visit(child, value)
+    
+    visit(trie, data)
+    return {key_path: results[key_path] for key_path in key_paths}
+
+def _trie_paths(node: Dict[Any, Any]) -> Iterator[str]:
+    for segment, child in node.items():
+        if segment is None:
+            yield from child
+        else:
+            yield from _trie_paths(child)
+
+class SchemaError(ValueError):
+    def __init__(self, message: str, path: Optional[List[str]] = None):
+        super().__init__(message)
+        self.message = message
+        self.path = path or []
+    
+    def at(self, segment: str) -> 'SchemaError':
+        return SchemaError(self.message, [segment] + self.path)
+    
+    def __str__(self) -> str:
+        return f"{'.'.join(['$'] + self.path)}: {self.message}"
+
+def _scalar_decoder(expected: type):
+    def decode(value: Any) -> Any:
+        if type(value) is expected:
+            return value
+        if expected is float and type(value) is int:
+            return float(value)
+        raise SchemaError(f"expected {expected.__name__}, got {type(value).__name__}")
+    return decode
+
+def _list_decoder(item_type: Any):
+    decode_item = build_decoder(item_type)
+    
+    def decode(value: Any) -> List[Any]:
+        if not isinstance(value, list):
+            raise SchemaError(f"expected list, got {type(value).__name__}")
+        result = []
+        for i, item in enumerate(value):
+            try:
+                result.append(decode_item(item))
+            except SchemaError as e:
+                raise e.at(str(i)) from None
+        return result
+    return decode
+
+def _dict_decoder(value_type: Any):
+    decode_value = build_decoder(value_type)
+    
+    def decode(value: Any) -> Dict[str, Any]:
+        if not isinstance(value, dict):
+            raise SchemaError(f"expected object, got {type(value).__name__}")
+        result = {}
+        for key, item in value.items():
+            try:
+                result[key] = decode_value(item)
+            except SchemaError as e:
+                raise e.at(str(key)) from None
+        return result
+    return decode
+
+def _union_decoder(options: tuple):
+    decoders = [build_decoder(option) for option in options]
+    allows_none = type(None) in options
+    
+    def decode(value: Any) -> Any:
+        if value is None and allows_none:
+            return None
+        for decode_option in decoders:
+            try:
+                return decode_option(value)
+            except SchemaError:
+                pass
+        names = ', '.join(getattr(option, '__name__', str(option)) for option in options)
+        raise SchemaError(f"expected one of ({names}), got {type(value).__name__}")
+    return decode
+
+def _dataclass_decoder(schema: type):
+    hints = typing.get_type_hints(schema, localns={schema.__name__: schema})
+    specs = [(field.name, build_decoder(hints[field.name]),
+              field.default is NO_DEFAULT and field.default_factory is NO_DEFAULT)
+             for field in fields(schema) if field.init]
+    
+    def decode(value: Any) -> Any:
+        if not isinstance(value, dict):
+            raise SchemaError(f"expected object for {schema.__name__}, got {type(value).__name__}")
+        kwargs = {}
+        for name, decode_field, required in specs:
+            if name in value:
+                try:
+                    kwargs[name] = decode_field(value[name])
+                except SchemaError as e:
+                    raise e.at(name) from None
+            elif required:
+                raise SchemaError(f"missing required field '{name}'")
+        return schema(**kwargs)
+    return decode
+
+def _typeddict_decoder(schema: type):
+    hints = typing.get_type_hints(schema, localns={schema.__name__: schema})
+    specs = [(name, build_decoder(hint), name in schema.__required_keys__) for name, hint in hints.items()]
+    
+    def decode(value: Any) -> Dict[str, Any]:
+        if not isinstance(value, dict):
+            raise SchemaError(f"expected object for {schema.__name__}, got {type(value).__name__}")
+        result = {}
+        for name, decode_field, required in specs:
+            if name in value:
+                try:
+                    result[name] = decode_field(value[name])
+                except SchemaError as e:
+                    raise e.at(name) from None
+            elif required:
+                raise SchemaError(f"missing required field '{name}'")
+        return result
+    return decode
+
+_decoders_in_progress: Dict[type, list] = {}
+
+def _recursive_decoder(schema: type, build):
+    # A class that refers to itself (children: List['Node']) gets a forwarding decoder
+    # while its own decoder is still being built.
+    if schema in _decoders_in_progress:
+        holder = _decoders_in_progress[schema]
+        return lambda value: holder[0](value)
+    holder = _decoders_in_progress[schema] = [None]
+    try:
+        holder[0] = build(schema)
+    finally:
+        del _decoders_in_progress[schema]
+    return holder[0]
+
+@lru_cache(maxsize=None)
+def build_decoder(schema: Any):
+    if schema is Any:
+        return lambda value: value
+    if schema is type(None):
+        def decode_none(value: Any) -> None:
+            if value is not None:
+                raise SchemaError(f"expected null, got {type(value).__name__}")
+        return decode_none
+    if schema in (int, float, str, bool):
+        return _scalar_decoder(schema)
+    if schema is list:
+        return _list_decoder(Any)
+    if schema is dict:
+        return _dict_decoder(Any)
+    if is_dataclass(schema):
+        return _recursive_decoder(schema, _dataclass_decoder)
+    if typing.is_typeddict(schema):
+        return _recursive_decoder(schema, _typeddict_decoder)
+    
+    origin, args = typing.get_origin(schema), typing.get_args(schema)
+    if origin in (Union, types.UnionType):
+        return _union_decoder(args)
+    if origin is list:
+        return _list_decoder(args[0] if args else Any)
+    if origin is dict:
+        return _dict_decoder(args[1] if args else Any)
+    raise TypeError(f"Unsupported schema type: {schema!r}")
+
+def decode_typed(value: Any, schema: Any) -> Any:
+    return build_decoder(schema)(value)
+
+def decode_typed_stream(reader: JSONStreamReader, schema: Any) -> Any:
+    # A top-level list or dict is decoded one element at a time, so the untyped document is
+    # never held in memory next to the typed result.
+    origin, args = (schema, ()) if schema in (list, dict) else (typing.get_origin(schema), typing.get_args(schema))
+    opening = reader._peek()
+    if origin is list and opening == '[':
+        decode_item, result = build_decoder(args[0] if args else Any), []
+    elif origin is dict and opening == '{':
+        decode_item, result = build_decoder(args[1] if args else Any), {}
+    else:
+        return build_decoder(schema)(reader.decode_value())
+    
+    for key in reader._iter_container():
+        try:
+            item = decode_item(reader.decode_value())
+        except SchemaError as e:
+            raise e.at(key) from None
+        if origin is list:
+            result.append(item)
+        else:
+            result[key] = item
+    return result
+
+def to_plain(value: Any) -> Any:
+    if is_dataclass(value):
+        return {field.name: to_plain(getattr(value, field.name)) for field in fields(value)}
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    return value
+
+def deep_merge(base: Any, other: Any) -> Any:
+    if not isinstance(base, dict) or not isinstance(other, dict):
+        return other
+    merged = dict(base)
+    for key, value in other.items():
+        merged[key] = deep_merge(merged[key], value) if key in merged else value
+    return merged
+
+def merge_json_files(input_paths: List[str], output_path: str, key: Optional[str] = None,
+                     path: Optional[str] = None, deep: bool = True,
+                     max_items_in_memory: int = 100000) -> int:
+    items = chain.from_iterable(JSONProcessor(input_path).iter_json(path) for input_path in input_paths)
+    
+    if key is not None:
+        key_path = compile_path(key)
+        sort_key = lambda item: codec.dumps(key_path.get(item), sort_keys=True)
+        ordered = external_sort(items, sort_key, max_rows_in_memory=max_items_in_memory)
+        
+        def deduplicated() -> Iterator[Any]:
+            for item_key, group in groupby(ordered, sort_key):
+                if item_key == 'null':
+                    yield from group
+                elif deep:
+                    yield reduce(deep_merge, group)
+                else:
+                    yield reduce(lambda _, item: item, group)
+        
+        items = deduplicated()
+    
+    directory = os.path.dirname(os.path.abspath(output_path))
+    count = 0
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory,
+                                     suffix='.tmp', delete=False) as file:
+        temp_path = file.name
+        try:
+            file.write('[')
+            for item in items:
+                file.write(',\n' if count else '\n')
+                file.write(codec.dumps(item))
+                count += 1
+            file.write('\n]\n')
+        except BaseException:
+            file.close()
+            os.remove(temp_path)
+            raise
+    os.replace(temp_path, output_path)
+    return count
+
+STRUCTURAL_BYTES = re.compile(rb'[\[\]{},"]')
+STRING_BODY = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+OFFSET_INDEX_MAGIC = b'JSONIDX1'
+
+class JSONArrayIndex:
     def __init__(self, file_path: str):
         self.file_path = file_path
+        self.index_path = file_path + '.offsets'
+        self.offsets = array('Q')
+        self._file = None
+        self._mapped = None
+        self._signature_seen = None
+    
+    def _signature(self) -> Dict[str, int]:
+        stat = os.stat(self.file_path)
+        return {'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+    
+    def build(self) -> 'JSONArrayIndex':
+        offsets = array('Q')
+        with open(self.file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                raise ValueError(f"{self.file_path} is empty")
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                depth = 0
+                start = None
+                position = 0
+                while True:
+                    match = STRUCTURAL_BYTES.search(mapped, position)
+                    if match is None:
+                        break
+                    char = match.group()
+                    position = match.end()
+                    if char == b'"':
+                        string = STRING_BODY.match(mapped, match.start())
+                        if string is None:
+                            raise ValueError("Unterminated string in JSON array")
+                        position = string.end()
+                    elif char in b'[{':
+                        depth += 1
+                        if depth == 1:
+                            if char != b'[':
+                                raise ValueError(f"{self.file_path} does not contain a top-level array")
+                            start = position
+                    elif char in b']}':
+                        if depth == 1 and mapped[start:match.start()].strip():
+                            offsets.extend((start, match.start()))
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    elif depth == 1:
+                        offsets.extend((start, match.start()))
+                        start = position
+            finally:
+                mapped.close()
+        self.offsets = offsets
+        return self
+    
+    def save(self):
+        header = json.dumps({**self._signature(), 'byteorder': sys.byteorder}).encode('utf-8')
+        with open(self.index_path, 'wb') as file:
+            file.write(OFFSET_INDEX_MAGIC)
+            file.write(struct.pack('<I', len(header)))
+            file.write(header)
+            file.write(self.offsets.tobytes())
+    
+    def load(self) -> bool:
+        try:
+            with open(self.index_path, 'rb') as file:
+                if file.read(len(OFFSET_INDEX_MAGIC)) != OFFSET_INDEX_MAGIC:
+                    return False
+                header = json.loads(file.read(struct.unpack('<I', file.read(4))[0]))
+                if {key: header.get(key) for key in ('mtime', 'size')} != self._signature():
+                    return False
+                offsets = array('Q')
+                offsets.frombytes(file.read())
+                if header['byteorder'] != sys.byteorder:
+                    offsets.byteswap()
+                self.offsets = offsets
+                return True
+        except (FileNotFoundError, ValueError, struct.error):
+            return False
+    
+    def ensure(self) -> 'JSONArrayIndex':
+        # Offsets stay in memory between lookups; only a changed data file (mtime/size)
+        # sends us back to the .offsets file or a rebuild.
+        signature = self._signature()
+        if signature == self._signature_seen:
+            return self
+        self.close()
+        if not self.load():
+            self.build()
+            self.save()
+        self._signature_seen = signature
+        return self
+    
+    def _map(self) -> mmap.mmap:
+        if self._mapped is None:
+            self._file = open(self.file_path, 'rb')
+            self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mapped
+    
+    def close(self):
+        if self._mapped is not None:
+            self._mapped.close()
+            self._file.close()
+            self._mapped = self._file = None
+    
+    def __len__(self) -> int:
+        return len(self.offsets) // 2
+    
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("JSON array index out of range")
+        start, end = self.offsets[2 * index], self.offsets[2 * index + 1]
+        return codec.loads(self._map()[start:end])
+    
+    def get_many(self, indices: Iterable[int]) -> List[Any]:
+        return [self[index] for index in indices]
+
+class JSONProcessor:
+    def __init__(self, file_path: str, write_behind: Optional[float] = None,
+                 patch_log: bool = False, compact_every: int = 1000):
+        self.file_path = file_path
         self.data: Union[Dict[str, Any], List[Any], None] = None
+        self.write_behind = write_behind
+        self.patch_log = patch_log
+        self.compact_every = compact_every
+        self._batch_depth = 0
+        self._dirty = False
+        self._patch_count = 0
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._array_index: Optional[JSONArrayIndex] = None
+        self.schema: Any = None
+    
+    def get_record(self, index: int) -> Any:
+        self._sync_to_disk()
+        if self._array_index is None:
+            self._array_index = JSONArrayIndex(self.file_path)
+        return self._array_index.ensure()[index]
+    
+    def get_records(self, indices: Iterable[int]) -> List[Any]:
+        self._sync_to_disk()
+        if self._array_index is None:
+            self._array_index = JSONArrayIndex(self.file_path)
+        return self._array_index.ensure().get_many(indices)
+    
+    @property
+    def patch_log_path(self) -> str:
+        return self.file_path + '.patch'
+    
+    def _replay_patch_log(self):
+        self._patch_count = 0
+        if not os.path.exists(self.patch_log_path):
+            return
+        applied = 0
+        with open(self.patch_log_path, 'rb') as file:
+            for line in file:
+                if not line.endswith(b'\n'):
+                    # A crash in the middle of an append leaves a partial last line; every
+                    # complete patch before it is still valid.
+                    print(f"Discarding incomplete last patch in {self.patch_log_path}")
+                    break
+                applied += len(line)
+                if not line.strip():
+                    continue
+                patch = codec.loads(line)
+                if patch['op'] in ('add', 'replace'):
+                    assign_path(self.data, from_pointer(patch['path']), patch['value'])
+                self._patch_count += 1
+        if applied < os.path.getsize(self.patch_log_path):
+            with open(self.patch_log_path, 'r+b') as file:
+                file.truncate(applied)
+    
+    def _sync_to_disk(self, force: bool = False):
+        # Readers that go straight to the file (streaming, offset index, merge) must not see
+        # a base file that is missing pending writes or patch-log entries.
+        with self._lock:
+            if self._batch_depth and not force:
+                return
+            if self._dirty:
+                self.flush()
+            if self.patch_log and os.path.exists(self.patch_log_path):
+                self.compact()
     
     def load_json(self) -> Union[Dict[str, Any], List[Any], None]:
         try:
             with open(self.file_path, 'r', encoding='utf-8') as file:
-                self.data = json.load(file)
+                self.data = codec.load(file)
+            if self.patch_log:
+                self._replay_patch_log()
             print(f"Successfully loaded JSON from {self.file_path}")
             return self.data
         except FileNotFoundError:
@@ -20,53 +769,202 @@ class JSONProcessor:
             print(f"Error decoding JSON: {e}")
             return {}
     
+    def iter_json(self, path: Optional[str] = None) -> Iterator[Any]:
+        self._sync_to_disk()
+        with open(self.file_path, 'r', encoding='utf-8') as file:
+            yield from JSONStreamReader(file).iter_path(parse_path(path))
+    
+    def load_typed(self, schema: Any, path: Optional[str] = None) -> Any:
+        try:
+            if path is not None:
+                # Items picked out of the document are returned, not stored: self.data has to
+                # stay the whole document or a later save_json would overwrite the file with them.
+                decode = build_decoder(schema)
+                items = [decode(item) for item in self.iter_json(path)]
+                print(f"Successfully loaded {len(items)} typed items from {self.file_path}")
+                return items
+            
+            if msgspec is not None:
+                with open(self.file_path, 'rb') as file:
+                    try:
+                        self.data = msgspec.json.decode(file.read(), type=schema)
+                    except msgspec.ValidationError as e:
+                        raise SchemaError(str(e)) from None
+                    except msgspec.DecodeError as e:
+                        raise json.JSONDecodeError(str(e), '', 0) from None
+            else:
+                with open(self.file_path, 'r', encoding='utf-8') as file:
+                    self.data = decode_typed_stream(JSONStreamReader(file), schema)
+            self.schema = schema
+            print(f"Successfully loaded typed JSON from {self.file_path}")
+            return self.data
+        except FileNotFoundError:
+            print(f"Error: File {self.file_path} not found")
+            return None
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON: {e}")
+            return None
+        except SchemaError as e:
+            print(f"Schema validation failed: {e}")
+            return None
+    
+    def filter_stream(self, filter_func, path: Optional[str] = None,
+                      limit: Optional[int] = None, schema: Any = None) -> Iterator[Any]:
+        if limit is not None and limit <= 0:
+            return
+        decode = build_decoder(schema) if schema is not None else None
+        found = 0
+        for item in self.iter_json(path):
+            if decode is not None:
+                item = decode(item)
+            if filter_func(item):
+                yield item
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+    
     def save_json(self, data: Union[Dict[str, Any], List[Any]], indent: int = 2) -> bool:
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        temp_path = None
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as file:
-                json.dump(data, file, indent=indent, ensure_ascii=False)
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory,
+                                             suffix='.tmp', delete=False) as file:
+                temp_path = file.name
+                codec.dump(to_plain(data) if self.schema is not None else data, file, indent=indent)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.file_path)
+            if self.patch_log and os.path.exists(self.patch_log_path):
+                os.remove(self.patch_log_path)
+            self._patch_count = 0
             print(f"Successfully saved JSON to {self.file_path}")
             return True
         except Exception as e:
             print(f"Error saving JSON: {e}")
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
             return False
     
+    def _append_patch(self, keys: List[str], value: Any) -> bool:
+        try:
+            with open(self.patch_log_path, 'a', encoding='utf-8') as file:
+                file.write(codec.dumps({'op': 'add', 'path': to_pointer(keys), 'value': value}) + '\n')
+            self._patch_count += 1
+            if self._patch_count >= self.compact_every:
+                return self.compact()
+            return True
+        except Exception as e:
+            print(f"Error appending patch: {e}")
+            return False
+    
+    def compact(self) -> bool:
+        with self._lock:
+            if self.data is None:
+                self.load_json()
+            return self.save_json(self.data)
+    
+    def flush(self) -> bool:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
+            self._dirty = False
+            return self.save_json(self.data)
+    
+    def close(self) -> bool:
+        flushed = self.flush()
+        if self.patch_log and os.path.exists(self.patch_log_path):
+            return self.compact() and flushed
+        return flushed
+    
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        except Exception:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._dirty:
+                    self._dirty = False
+                    self.data = None
+            raise
+        else:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+    
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.write_behind, self.flush)
+            self._timer.start()
+    
+    @staticmethod
+    def _is_container(data: Any) -> bool:
+        return isinstance(data, (dict, list)) or (is_dataclass(data) and not isinstance(data, type))
+    
     def get_value(self, key_path: str, default=None):
         if not self.data:
             self.load_json()
         
-        if not isinstance(self.data, dict):
+        if not self._is_container(self.data):
             return default
         
-        keys = key_path.split('.')
-        current = self.data
+        return compile_path(key_path).get(self.data, default)
+    
+    def get_values(self, key_paths: List[str], default=None) -> Dict[str, Any]:
+        if not self.data:
+            self.load_json()
         
-        try:
-            for key in keys:
-                current = current[key]
-            return current
-        except (KeyError, TypeError):
-            return default
+        return get_many(self.data, key_paths, default)
     
     def set_value(self, key_path: str, value: Any):
         if not self.data:
             self.load_json()
         
-        if not isinstance(self.data, dict):
-            print("Cannot set value on non-dict data")
+        if not self._is_container(self.data):
+            print("Cannot set value on non-container data")
             return False
         
-        keys = key_path.split('.')
-        current = self.data
-        
-        for key in keys[:-1]:
-            if key not in current:
-                current[key] = {}
-            current = current[key]
-        
-        current[keys[-1]] = value
-        return self.save_json(self.data)
+        path = compile_path(key_path)
+        keys = path.keys
+        with self._lock:
+            try:
+                path.set(self.data, value)
+            except (KeyError, ValueError, IndexError) as e:
+                print(f"Cannot set value: {e}")
+                return False
+            
+            if self._batch_depth:
+                self._dirty = True
+                return True
+            if self.patch_log:
+                return self._append_patch(keys, value)
+            if self.write_behind is not None:
+                self._dirty = True
+                self._schedule_flush()
+                return True
+            return self.save_json(self.data)
     
-    def filter_data(self, filter_func) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    def filter_data(self, filter_func, path: Optional[str] = None, limit: Optional[int] = None,
+                    schema: Any = None) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        if path is not None or limit is not None or schema is not None:
+            try:
+                return list(self.filter_stream(filter_func, path, limit, schema))
+            except FileNotFoundError:
+                print(f"Error: File {self.file_path} not found")
+                return []
+            except json.JSONDecodeError as e:
+                print(f"Error decoding JSON: {e}")
+                return []
+            except SchemaError as e:
+                print(f"Schema validation failed: {e}")
+                return []
+        
         if not self.data:
             self.load_json()
         
@@ -77,16 +975,38 @@ class JSONProcessor:
         else:
             return []
     
-    def merge_json(self, other_file_path: str) -> bool:
+    def merge_json(self, other_file_path: str, key: Optional[str] = None, deep: bool = False,
+                   max_items_in_memory: int = 100000) -> bool:
+        if key is not None:
+            try:
+                with self._lock:
+                    self._sync_to_disk(force=True)
+                    count = merge_json_files([self.file_path, other_file_path], self.file_path, key,
+                                             deep=deep, max_items_in_memory=max_items_in_memory)
+                    # The merged file is re-sorted, so index-based patches no longer apply to it.
+                    if os.path.exists(self.patch_log_path):
+                        os.remove(self.patch_log_path)
+                    self._patch_count = 0
+                    self._dirty = False
+                    self.data = None
+                print(f"Merged {other_file_path} into {self.file_path} ({count} unique items)")
+                return True
+            except Exception as e:
+                print(f"Error merging JSON: {e}")
+                return False
+        
         try:
             with open(other_file_path, 'r', encoding='utf-8') as file:
-                other_data = json.load(file)
+                other_data = codec.load(file)
             
             if not self.data:
                 self.load_json()
             
             if isinstance(self.data, dict) and isinstance(other_data, dict):
-                self.data.update(other_data)
+                if deep:
+                    self.data = deep_merge(self.data, other_data)
+                else:
+                    self.data.update(other_data)
             elif isinstance(self.data, list) and isinstance(other_data, list):
                 self.data.extend(other_data)
             else:
@@ -98,6 +1018,14 @@ class JSONProcessor:
             print(f"Error merging JSON: {e}")
             return False
 
+@dataclass(slots=True)
+class User:
+    id: int
+    name: str
+    age: int
+    city: str
+    email: Optional[str] = None
+
 def create_sample_data():
     sample_data = {
         "users": [
@@ -130,15 +1058,30 @@ def main():
     print(f"User 1 name: {processor.get_value('users.0.name')}")
     print(f"Settings theme: {processor.get_value('settings.theme')}")
     print(f"Non-existent key: {processor.get_value('non.existent.key', 'default')}")
+    print(f"All user names: {processor.get_value('users.*.name')}")
+    print(f"Bulk lookup: {processor.get_values(['users.0.city', 'settings.language', 'users.9.name'])}")
     
     print("\n--- Setting values ---")
     processor.set_value('settings.new_setting', 'new_value')
     processor.set_value('users.0.email', 'alice@example.com')
     
+    print("\n--- Batched updates ---")
+    with processor.batch():
+        for i in range(100):
+            processor.set_value(f'counters.key_{i}', i)
+    
     print("\n--- Filtering data ---")
     users_over_30 = processor.filter_data(lambda x: x.get('age', 0) > 30)
     print(f"Users over 30: {users_over_30}")
     
+    print("\n--- Streaming filter ---")
+    first_user_over_30 = processor.filter_data(lambda x: x.get('age', 0) > 30, path='users.*', limit=1)
+    print(f"First user over 30 (streamed): {first_user_over_30}")
+    
+    print("\n--- Typed records ---")
+    typed_users = processor.filter_data(lambda user: user.age > 30, path='users.*', schema=User)
+    print(f"Typed users over 30: {typed_users}")
+    
     print("\n--- Updated data ---")
     updated_data = processor.load_json()
     print(f"Updated data: {json.dumps(updated_data, indent=2)}")
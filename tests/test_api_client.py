@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from api_client import APIClient, AsyncAPIClient, RetryPolicy
+
+
+def make_handler(latency=0.05, failures=0, retry_after='0'):
+    class JSONHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        hits = Counter()
+        lock = threading.Lock()
+
+        def do_GET(self):
+            with self.lock:
+                self.hits[self.path] += 1
+                attempt = self.hits[self.path]
+            time.sleep(latency)
+            if attempt <= failures:
+                self.send_response(503)
+                self.send_header('Retry-After', retry_after)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = json.dumps({'path': self.path}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return JSONHandler
+
+
+def test_get_retries_on_retryable_status(serve):
+    handler = make_handler(latency=0, failures=2)
+    client = APIClient(serve(handler), retry=RetryPolicy(max_retries=3))
+
+    assert client.get('posts/1') == {'path': '/posts/1'}
+    assert handler.hits['/posts/1'] == 3
+    client.close()
+
+
+def test_get_gives_up_after_max_retries(serve):
+    handler = make_handler(latency=0, failures=5)
+    client = APIClient(serve(handler), retry=RetryPolicy(max_retries=1))
+
+    assert client.get('posts/1') is None
+    assert handler.hits['/posts/1'] == 2
+    client.close()
+
+
+@pytest.mark.parametrize('retry_after, expected', [
+    ('2', 2.0),
+    ('86400', None),
+    ('Wed, 21 Oct 2099 07:28:00 GMT', None),
+    ('-5', 0.0),
+])
+def test_retry_after_past_backoff_max_stops_retrying(retry_after, expected):
+    assert RetryPolicy(backoff_max=30.0).delay(0, {'Retry-After': retry_after}) == expected
+
+
+def test_clients_give_up_when_retry_after_exceeds_the_budget(serve):
+    handler = make_handler(latency=0, failures=1, retry_after='120')
+    base_url = serve(handler)
+    retry = RetryPolicy(max_retries=3, backoff_max=1.0)
+    client = APIClient(base_url, retry=retry)
+    async_client = AsyncAPIClient(base_url, retry=retry)
+
+    started = time.monotonic()
+    assert client.get('posts/1') is None
+    assert async_client.run_all([async_client.get('posts/2')]) == [None]
+    assert time.monotonic() - started < 1.0
+    assert handler.hits['/posts/1'] == 1 and handler.hits['/posts/2'] == 1
+    client.close()
+    async_client.close()
+
+
+def test_backoff_without_retry_after_stays_in_bounds():
+    policy = RetryPolicy(backoff_factor=0.5, backoff_max=1.0)
+
+    assert all(0 <= policy.delay(attempt) <= 1.0 for attempt in range(10))
+    assert 0 <= policy.delay(0, {'Retry-After': 'nan'}) <= 0.5
+
+
+def test_async_client_runs_requests_concurrently(serve):
+    handler = make_handler(latency=0.2)
+    client = AsyncAPIClient(serve(handler), concurrency=10)
+
+    started = time.monotonic()
+    results = client.run_all(client.get(f'posts/{post_id}') for post_id in range(10))
+    elapsed = time.monotonic() - started
+
+    assert results == [{'path': f'/posts/{post_id}'} for post_id in range(10)]
+    assert elapsed < 1.0
+    client.close()
+
+
+def test_async_client_coalesces_identical_gets(serve):
+    handler = make_handler()
+    client = AsyncAPIClient(serve(handler))
+
+    results = client.run(client.gather(client.get('posts', {'id': [1, 2]}),
+                                       client.get('posts', {'id': [1, 2]}),
+                                       client.get('posts', {'id': [3]})))
+
+    assert results == [{'path': '/posts?id=1&id=2'}] * 2 + [{'path': '/posts?id=3'}]
+    assert handler.hits['/posts?id=1&id=2'] == 1
+    assert handler.hits['/posts?id=3'] == 1
+    client.close()
+
+
+def test_async_client_retries(serve):
+    handler = make_handler(latency=0, failures=1)
+    client = AsyncAPIClient(serve(handler))
+
+    assert client.run(client.get('posts/1')) == {'path': '/posts/1'}
+    assert handler.hits['/posts/1'] == 2
+    client.close()
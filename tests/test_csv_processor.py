@@ -0,0 +1,290 @@
+import csv
+
+import pytest
+
+from csv_processor import (ColumnarTable, CSVProcessor, Expr, GroupBy, HashIndex, RowStream, SortedIndex, col,
+                           find_record_boundaries, hash_join, make_sort_key, sort_merge_join)
+
+LEFT = [
+    {'id': '1', 'name': 'ann'},
+    {'id': '2', 'name': 'bob'},
+    {'id': '2', 'name': 'bea'},
+    {'id': '4', 'name': 'dan'},
+]
+RIGHT = [
+    {'id': '2', 'city': 'Oslo'},
+    {'id': '3', 'city': 'Rome'},
+    {'id': '4', 'city': 'Kyiv'},
+    {'id': '4', 'city': 'Lima'},
+]
+
+
+def canonical(rows):
+    return sorted(tuple(sorted(row.items())) for row in rows)
+
+
+def write_csv(path, headers, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.mark.parametrize('how, expected', [
+    ('inner', [('2', 'bob', 'Oslo'), ('2', 'bea', 'Oslo'), ('4', 'dan', 'Kyiv'), ('4', 'dan', 'Lima')]),
+    ('left', [('1', 'ann', None), ('2', 'bob', 'Oslo'), ('2', 'bea', 'Oslo'),
+              ('4', 'dan', 'Kyiv'), ('4', 'dan', 'Lima')]),
+    ('right', [('2', 'bob', 'Oslo'), ('2', 'bea', 'Oslo'), ('3', None, 'Rome'),
+               ('4', 'dan', 'Kyiv'), ('4', 'dan', 'Lima')]),
+    ('outer', [('1', 'ann', None), ('2', 'bob', 'Oslo'), ('2', 'bea', 'Oslo'), ('3', None, 'Rome'),
+               ('4', 'dan', 'Kyiv'), ('4', 'dan', 'Lima')]),
+    ('semi', [('2', 'bob', None), ('2', 'bea', None), ('4', 'dan', None)]),
+    ('anti', [('1', 'ann', None)]),
+])
+def test_joins(how, expected):
+    expected_rows = [{key: value for key, value in zip(('id', 'name', 'city'), row) if value is not None}
+                     for row in expected]
+
+    assert canonical(hash_join(LEFT, RIGHT, 'id', how)) == canonical(expected_rows)
+    assert canonical(sort_merge_join(LEFT, RIGHT, 'id', how, max_rows_in_memory=2)) == \
+        canonical(expected_rows)
+
+
+def test_hash_join_can_build_on_the_left():
+    assert canonical(hash_join(LEFT, RIGHT, 'id', build_left=True)) == canonical(hash_join(LEFT, RIGHT, 'id'))
+
+
+def test_join_on_several_columns():
+    left = [{'a': 1, 'b': 1, 'x': 'l1'}, {'a': 1, 'b': 2, 'x': 'l2'}]
+    right = [{'a': 1, 'b': 2, 'y': 'r'}]
+
+    assert list(hash_join(left, right, ['a', 'b'])) == [{'a': 1, 'b': 2, 'x': 'l2', 'y': 'r'}]
+
+
+def test_sort_key_orders_numbers_before_text_and_blanks_last():
+    rows = [{'v': '10'}, {'v': ''}, {'v': 'b'}, {'v': '9'}, {'v': None}, {'v': 'a'}]
+
+    ascending = sorted(rows, key=make_sort_key('v'))
+    descending = sorted(rows, key=make_sort_key('v', reverse=True))
+
+    assert [row['v'] for row in ascending[:4]] == ['9', '10', 'a', 'b']
+    assert [row['v'] for row in descending[:4]] == ['b', 'a', '10', '9']
+    assert {row['v'] for row in ascending[4:]} == {'', None}
+    assert {row['v'] for row in descending[4:]} == {'', None}
+
+
+def test_sort_key_mixed_directions_and_dates():
+    rows = [
+        {'team': 'a', 'joined': '2021-03-01'},
+        {'team': 'b', 'joined': '2020-01-01'},
+        {'team': 'a', 'joined': '2022-05-01'},
+    ]
+    key = make_sort_key(['team', 'joined'], [False, True], types={'joined': 'date'})
+
+    assert [row['joined'] for row in sorted(rows, key=key)] == ['2022-05-01', '2021-03-01', '2020-01-01']
+
+
+def test_external_sort_matches_in_memory_sort():
+    rows = [{'n': str((i * 37) % 101)} for i in range(300)]
+
+    spilled = RowStream(lambda: rows).sort('n', max_rows_in_memory=16).collect()
+
+    assert spilled == sorted(rows, key=make_sort_key('n'))
+
+
+def test_columnar_sort_matches_row_sort():
+    rows = [{'v': value} for value in ('3', '1.5', 'x', '', '20', '-2')]
+    table = ColumnarTable.from_rows(rows, parse_text=True)
+
+    for reverse in (False, True):
+        columnar = [row['v'] for row in table.sort('v', reverse).rows()]
+        by_rows = [str(row['v']) if row['v'] is not None else '' for row in
+                   sorted(table.rows(), key=make_sort_key('v', reverse))]
+        assert [str(value) if value is not None else '' for value in columnar] == by_rows
+
+
+def test_top_k_uses_the_same_order_as_sort():
+    rows = [{'n': str(n)} for n in (5, 3, 9, 1, 7)]
+
+    assert RowStream(lambda: rows).top_k('n', 2) == [{'n': '9'}, {'n': '7'}]
+    assert RowStream(lambda: rows).top_k('n', 2, reverse=False) == [{'n': '1'}, {'n': '3'}]
+
+
+@pytest.mark.parametrize('max_groups', [100000, 3])
+def test_group_by_aggregates(max_groups):
+    rows = [{'team': f't{i % 7}', 'score': str(i)} for i in range(70)]
+
+    results = GroupBy(rows, 'team', max_groups=max_groups, partitions=4).agg(
+        n=('*', 'count'), total=('score', 'sum'), best=('score', 'max'), distinct=('score', 'count_distinct'))
+
+    by_team = {result['team']: result for result in results}
+    assert len(by_team) == 7
+    assert by_team['t0'] == {'team': 't0', 'n': 10, 'total': sum(range(0, 70, 7)), 'best': 63.0,
+                             'distinct': 10}
+
+
+def test_group_by_sketches_stay_close_to_exact_results():
+    rows = [{'team': f't{i % 2}', 'score': str((i * 7919) % 20000)} for i in range(20000)]
+    aggregations = {'median': ('score', 'median'), 'p90': ('score', 'percentile', 90),
+                    'distinct': ('score', 'count_distinct')}
+
+    approximate = {row['team']: row for row in GroupBy(rows, 'team', max_groups=1).agg(**aggregations)}
+    exact = {row['team']: row for row in GroupBy(rows, 'team', exact=True).agg(**aggregations)}
+
+    assert exact['t0']['distinct'] == 10000
+    for team in ('t0', 't1'):
+        assert abs(approximate[team]['median'] - exact[team]['median']) < 200
+        assert abs(approximate[team]['p90'] - exact[team]['p90']) < 200
+        assert abs(approximate[team]['distinct'] - exact[team]['distinct']) < 500
+
+
+def test_group_by_rejects_unknown_aggregate():
+    with pytest.raises(ValueError):
+        GroupBy([], 'team').agg(x=('score', 'nope'))
+
+
+def test_find_record_boundaries_skip_quoted_newlines(tmp_path):
+    path = write_csv(tmp_path / 'quoted.csv', ['id', 'note'],
+                     [[i, f'line one\nline two {i}' if i % 3 == 0 else f'plain {i}'] for i in range(200)])
+
+    boundaries = find_record_boundaries(path, 64)
+
+    assert boundaries[0] == 0
+    with open(path, 'rb') as file:
+        data = file.read()
+    for boundary in boundaries[1:-1]:
+        assert data[:boundary].count(b'"') % 2 == 0
+        assert data[boundary - 1:boundary] == b'\n'
+
+
+def test_parallel_reader_matches_sequential_reader(tmp_path):
+    path = write_csv(tmp_path / 'people.csv', ['id', 'name', 'note'],
+                     [[i, f'name {i}', f'quoted, "note"\n{i}' if i % 5 == 0 else ''] for i in range(500)])
+
+    sequential = CSVProcessor(path).read_csv()
+    parallel = CSVProcessor(path).read_csv_parallel(workers=2, chunk_size=512)
+
+    assert parallel == sequential
+    assert len(parallel) == 500
+
+
+def test_parallel_columnar_reader_matches_columnar_reader(tmp_path):
+    path = write_csv(tmp_path / 'scores.csv', ['id', 'zip', 'score'],
+                     [[i, f'0{i % 7}', f'{i / 4}'] for i in range(300)])
+
+    sequential = CSVProcessor(path)
+    sequential.read_csv(columnar=True)
+    parallel = CSVProcessor(path)
+    parallel.read_csv_parallel(workers=2, chunk_size=256, columnar=True)
+
+    assert list(parallel.data) == list(sequential.data)
+    assert parallel.table.columns['id'].dtype == 'int'
+def test_parallel_reader_without_header(tmp_path):
+    path = write_csv(tmp_path / 'ragged.csv', ['a', 'b'], [[i] if i % 4 == 0 else [i, i * 2] for i in range(100)])
+
+    sequential = CSVProcessor(path).read_csv(has_header=False)
+    parallel = CSVProcessor(path).read_csv_parallel(has_header=False, workers=2, chunk_size=128)
+
+    assert parallel == sequential
+    assert parallel[1] == {'column_0': '0'}
+
+
+def test_indexes_follow_reloads(tmp_path):
+    path = write_csv(tmp_path / 'people.csv', ['id', 'team'], [[1, 'a'], [2, 'b'], [3, 'a']])
+    processor = CSVProcessor(path)
+    processor.read_csv()
+    processor.create_index('team')
+    processor.data = []
+    processor.read_csv_parallel(workers=1)
+
+    assert [row['id'] for row in processor.lookup('team', 'a')] == ['1', '3']
+
+
+def test_saved_indexes_round_trip_through_a_new_processor(tmp_path):
+    path = write_csv(tmp_path / 'people.csv', ['id', 'team'], [[1, 'a'], [2, 'b'], [3, 'a']])
+    processor = CSVProcessor(path)
+    processor.read_csv()
+    processor.create_index('team')
+    assert processor.save_indexes()
+
+    reopened = CSVProcessor(path)
+    assert reopened.load_indexes()
+    assert [row['id'] for row in reopened.lookup('team', 'a')] == ['1', '3']
+
+
+def test_read_csv_loads_a_matching_index_file_and_rebuilds_the_rest(tmp_path, monkeypatch):
+    path = write_csv(tmp_path / 'people.csv', ['id', 'team'], [[1, 'a'], [2, 'b'], [3, 'a']])
+    processor = CSVProcessor(path)
+    processor.read_csv()
+    processor.create_index('team')
+    processor.save_indexes()
+
+    reopened = CSVProcessor(path)
+    reopened.create_index('id', 'sorted')
+    built = []
+    for index_type in (HashIndex, SortedIndex):
+        original = index_type.build
+        monkeypatch.setattr(index_type, 'build',
+                            lambda self, rows, original=original: built.append(self.column) or original(self, rows))
+    reopened.read_csv()
+
+    assert built == ['id']
+    assert [row['id'] for row in reopened.lookup('team', 'b')] == ['2']
+    assert [row['id'] for row in reopened.range_lookup('id', 2)] == ['2', '3']
+
+
+def test_index_file_is_ignored_once_the_csv_changes(tmp_path):
+    path = write_csv(tmp_path / 'people.csv', ['id', 'team'], [[1, 'a'], [2, 'b']])
+    processor = CSVProcessor(path)
+    processor.read_csv()
+    processor.create_index('team')
+    processor.save_indexes()
+    write_csv(tmp_path / 'people.csv', ['id', 'team'], [[1, 'b'], [2, 'b'], [3, 'a']])
+
+    reopened = CSVProcessor(path)
+    assert not reopened.load_indexes()
+    assert [row['id'] for row in reopened.lookup('team', 'b')] == ['1', '2']
+
+
+def test_columnar_read_keeps_text_that_only_looks_numeric(tmp_path):
+    path = write_csv(tmp_path / 'codes.csv', ['zip', 'amount', 'count'],
+                     [['02139', '1.50', '1'], ['10001', '2', '2']])
+    processor = CSVProcessor(path)
+    processor.read_csv(columnar=True)
+
+    assert [row['zip'] for row in processor.data] == ['02139', '10001']
+    assert [row['amount'] for row in processor.data] == ['1.50', '2']
+    assert [row['count'] for row in processor.data] == [1, 2]
+
+
+def test_where_expression_on_rows_and_columns():
+    rows = [{'age': str(age), 'name': name} for age, name in ((30, 'ann'), (17, 'bob'), (45, 'cy'))]
+    expr = (col('age') >= 18) & col('name').isin(['ann', 'cy'])
+
+    assert [row['name'] for row in RowStream(lambda: rows).filter(expr)] == ['ann', 'cy']
+    assert [row['name'] for row in ColumnarTable.from_rows(rows).where(expr).rows()] == ['ann', 'cy']
+
+
+def test_expr_subclasses_must_implement_source_and_mask():
+    class Incomplete(Expr):
+        def source(self, accessor, namespace):
+            return 'True'
+
+    with pytest.raises(TypeError):
+        Expr()
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_column_stats_switch_to_sketches_past_max_distinct():
+    processor = CSVProcessor('unused.csv')
+    processor.data = [{'v': str(i)} for i in range(1, 1002)]
+
+    exact = processor.get_column_stats('v', exact=True)
+    approximate = ColumnarTable.from_rows(processor.data).column_stats('v', max_distinct=10).to_dict()
+
+    assert exact['median'] == 501 and exact['exact']
+    assert not approximate['exact']
+    assert abs(approximate['median'] - 501) < 25
+    assert approximate['mean'] == exact['mean']
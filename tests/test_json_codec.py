@@ -0,0 +1,94 @@
+import io
+import json
+import math
+
+import pytest
+
+from json_codec import JSONCodec, available_backends
+
+BACKENDS = sorted(available_backends())
+
+
+@pytest.fixture(params=BACKENDS)
+def codec(request):
+    return JSONCodec(request.param)
+
+
+def test_stdlib_backend_is_always_available():
+    assert 'json' in BACKENDS
+    assert JSONCodec('no-such-backend').name in BACKENDS
+
+
+@pytest.mark.parametrize('value', [
+    {'name': 'é', 'nested': {'list': [1, 2.5, None, True, False]}, 'empty': {}},
+    [{'id': 1}, {'id': 2}],
+    'slash / and "quotes"',
+])
+def test_round_trip(codec, value):
+    assert codec.loads(codec.dumpb(value)) == value
+    assert codec.loads(codec.dumps(value)) == value
+
+
+@pytest.mark.parametrize('indent, sort_keys', [(None, False), (2, False), (2, True), (4, True)])
+def test_formatting_options(codec, indent, sort_keys):
+    value = {'b': [1, {'d': 'x', 'c': None}], 'a': 1.5}
+    text = codec.dumps(value, indent=indent, sort_keys=sort_keys)
+
+    assert json.loads(text) == value
+    assert ('\n' in text) == (indent is not None)
+    if sort_keys:
+        assert text.index('"a"') < text.index('"b"')
+
+
+@pytest.fixture(params=BACKENDS)
+def strict_codec(request):
+    return JSONCodec(request.param, strict=True)
+
+
+def test_big_integers_survive_in_strict_mode(strict_codec):
+    value = {'id': 2 ** 64 + 1, 'negative': -(2 ** 70)}
+
+    assert strict_codec.loads(strict_codec.dumps(value)) == value
+    assert strict_codec.loads('[123456789012345678901234567890]') == [123456789012345678901234567890]
+    assert strict_codec.loads(b'{"id": 12345678901234567890123}') == {'id': 12345678901234567890123}
+
+
+def test_big_integers_encode_in_any_mode(codec):
+    assert json.loads(codec.dumps({'id': 2 ** 70})) == {'id': 2 ** 70}
+
+
+def test_non_string_keys_encode_like_stdlib(codec):
+    assert json.loads(codec.dumps({1: 'a', 2.5: 'b', True: 'c'})) == json.loads(
+        json.dumps({1: 'a', 2.5: 'b', True: 'c'}))
+
+
+def test_non_finite_floats_encode_like_stdlib_in_strict_mode(strict_codec):
+    text = strict_codec.dumps({'x': float('nan'), 'y': float('inf')})
+
+    assert 'NaN' in text and 'Infinity' in text
+    decoded = strict_codec.loads(text)
+    assert math.isnan(decoded['x']) and decoded['y'] == math.inf
+
+
+def test_non_finite_floats_decode_in_any_mode(codec):
+    decoded = codec.loads('{"x": NaN, "y": -Infinity}')
+
+    assert math.isnan(decoded['x']) and decoded['y'] == -math.inf
+
+
+def test_ensure_ascii(codec):
+    assert codec.dumps({'name': 'é'}, ensure_ascii=True) == '{"name":"\\u00e9"}'
+
+
+def test_invalid_documents_raise_value_error(codec):
+    with pytest.raises(ValueError):
+        codec.loads('{"unterminated": ')
+
+
+def test_file_helpers(codec):
+    buffer = io.StringIO()
+    codec.dump({'a': [1, 2]}, buffer, indent=2)
+    buffer.seek(0)
+
+    assert codec.load(buffer) == {'a': [1, 2]}
+    assert codec.loads(memoryview(b'{"a": 1}')) == {'a': 1}
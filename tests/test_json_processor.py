@@ -0,0 +1,244 @@
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, NotRequired, Optional, TypedDict
+
+import pytest
+
+import json_processor
+from json_processor import (JSONArrayIndex, JSONProcessor, JSONStreamReader, SchemaError, compile_path,
+                            decode_typed, decode_typed_stream, get_many, merge_json_files, parse_path)
+
+DOCUMENT = {
+    'users': [
+        {'name': 'ann', 'tags': ['a', 'b'], 'address': {'city': 'Oslo'}},
+        {'name': 'bob', 'tags': [], 'address': {'city': 'Rome'}},
+        {'name': 'cy', 'tags': ['c'], 'address': {}},
+    ],
+    'hours': {'10:30': 'open', '01': 'first'},
+}
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('users.0.name', 'ann'),
+    ('users.-1.name', 'cy'),
+    ('users.5.name', None),
+    ('users.*.name', ['ann', 'bob', 'cy']),
+    ('users.0:2.name', ['ann', 'bob']),
+    ('users.*.address.city', ['Oslo', 'Rome']),
+    ('users.*.tags.*', ['a', 'b', 'c']),
+    ('hours.10:30', 'open'),
+    ('hours.01', 'first'),
+    ('hours.1', None),
+])
+def test_compiled_path_get(path, expected):
+    assert compile_path(path).get(DOCUMENT) == expected
+
+
+def test_compiled_path_set_creates_missing_dicts():
+    data = {'users': [{'name': 'ann'}]}
+
+    compile_path('users.0.address.city').set(data, 'Oslo')
+    compile_path('hours.10:30').set(data, 'open')
+
+    assert data == {'users': [{'name': 'ann', 'address': {'city': 'Oslo'}}], 'hours': {'10:30': 'open'}}
+
+
+def test_compiled_path_rejects_bad_assignments():
+    with pytest.raises(ValueError):
+        compile_path('users.*.name').set({'users': []}, 'x')
+    with pytest.raises(ValueError):
+        compile_path('users.0:2').set({'users': [1, 2]}, 'x')
+    with pytest.raises(KeyError):
+        compile_path('users.3.name').set({'users': []}, 'x')
+
+
+def test_get_many_shares_prefixes():
+    assert get_many(DOCUMENT, ['users.0.name', 'users.1.address.city', 'missing.key'], 'n/a') == {
+        'users.0.name': 'ann',
+        'users.1.address.city': 'Rome',
+        'missing.key': 'n/a',
+    }
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_stream_reader_matches_json_loads(chunk_size):
+    text = json.dumps(DOCUMENT | {'escaped': 'quote " and \\ and é', 'numbers': [1, -2.5e3, True, None]})
+
+    reader = JSONStreamReader(io.StringIO(text), chunk_size=chunk_size)
+    assert list(reader.iter_path(parse_path('users.*.name'))) == ['ann', 'bob', 'cy']
+
+    reader = JSONStreamReader(io.StringIO(text), chunk_size=chunk_size)
+    assert list(reader.iter_path([])) == [json.loads(text)]
+
+
+def test_iter_json_streams_a_path(tmp_path):
+    processor = JSONProcessor(write_json(tmp_path / 'users.json', DOCUMENT))
+
+    assert list(processor.iter_json('users.*.address')) == [{'city': 'Oslo'}, {'city': 'Rome'}, {}]
+
+
+def test_array_index_reads_single_records(tmp_path):
+    path = write_json(tmp_path / 'items.json', [{'id': i, 'text': f'item {i}'} for i in range(50)])
+    index = JSONArrayIndex(path).ensure()
+
+    assert len(index) == 50
+    assert index[7] == {'id': 7, 'text': 'item 7'}
+    assert index.get_many([49, 0]) == [{'id': 49, 'text': 'item 49'}, {'id': 0, 'text': 'item 0'}]
+    index.close()
+
+
+def test_get_record_sees_unsaved_patches(tmp_path):
+    path = write_json(tmp_path / 'items.json', [{'id': i} for i in range(3)])
+    processor = JSONProcessor(path, patch_log=True)
+    processor.load_json()
+    processor.set_value('1.id', 10)
+
+    assert processor.get_record(1) == {'id': 10}
+    processor.close()
+
+
+def test_patch_log_replays_after_restart(tmp_path):
+    path = write_json(tmp_path / 'config.json', {'a': 1})
+    processor = JSONProcessor(path, patch_log=True)
+    processor.load_json()
+    processor.set_value('b.c', 2)
+
+    reopened = JSONProcessor(path, patch_log=True)
+    assert reopened.load_json() == {'a': 1, 'b': {'c': 2}}
+
+
+def test_patch_log_ignores_a_torn_last_line(tmp_path):
+    path = write_json(tmp_path / 'config.json', {'a': 1})
+    processor = JSONProcessor(path, patch_log=True)
+    processor.load_json()
+    processor.set_value('a', 2)
+    with open(processor.patch_log_path, 'a', encoding='utf-8') as file:
+        file.write('{"path": "/a", "val')
+
+    reopened = JSONProcessor(path, patch_log=True)
+    assert reopened.load_json() == {'a': 2}
+    reopened.set_value('b', 3)
+    assert JSONProcessor(path, patch_log=True).load_json() == {'a': 2, 'b': 3}
+
+
+def test_batch_writes_once(tmp_path):
+    path = write_json(tmp_path / 'config.json', {})
+    processor = JSONProcessor(path)
+    processor.load_json()
+    with processor.batch():
+        processor.set_value('a', 1)
+        processor.set_value('b', 2)
+        assert json.loads(open(path, encoding='utf-8').read()) == {}
+
+    assert json.loads(open(path, encoding='utf-8').read()) == {'a': 1, 'b': 2}
+
+
+def test_merge_files_by_key(tmp_path):
+    first = write_json(tmp_path / 'a.json', [{'id': 2, 'x': 1}, {'id': 1, 'x': 1}])
+    second = write_json(tmp_path / 'b.json', [{'id': 2, 'y': 2}, {'id': 3, 'y': 3}])
+    output = str(tmp_path / 'out.json')
+
+    assert merge_json_files([first, second], output, 'id', max_items_in_memory=1) == 3
+    assert json.loads(open(output, encoding='utf-8').read()) == [
+        {'id': 1, 'x': 1}, {'id': 2, 'x': 1, 'y': 2}, {'id': 3, 'y': 3}]
+
+
+def test_keyed_merge_keeps_pending_patches(tmp_path):
+    path = write_json(tmp_path / 'pages.json', [{'url': 'c', 'v': 0}, {'url': 'b', 'v': 0}, {'url': 'a', 'v': 0}])
+    other = write_json(tmp_path / 'other.json', [{'url': 'd', 'v': 9}])
+    processor = JSONProcessor(path, patch_log=True)
+    processor.load_json()
+    processor.set_value('1.v', 5)
+
+    assert processor.merge_json(other, key='url')
+    assert processor.load_json() == [
+        {'url': 'a', 'v': 0}, {'url': 'b', 'v': 5}, {'url': 'c', 'v': 0}, {'url': 'd', 'v': 9}]
+
+
+@dataclass
+class Address:
+    city: str
+    zip: Optional[str] = None
+
+
+@dataclass
+class Person:
+    name: str
+    address: Address
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Node:
+    value: int
+    children: List['Node'] = field(default_factory=list)
+
+
+def test_decode_typed_builds_nested_dataclasses():
+    person = decode_typed({'name': 'ann', 'address': {'city': 'Oslo'}, 'tags': ['a']}, Person)
+
+    assert person == Person('ann', Address('Oslo'), ['a'])
+
+
+def test_decode_typed_supports_recursive_dataclasses():
+    tree = decode_typed({'value': 1, 'children': [{'value': 2, 'children': [{'value': 3}]}]}, Node)
+
+    assert tree.children[0].children[0].value == 3
+
+
+def test_decode_typed_reports_the_failing_path():
+    with pytest.raises(SchemaError, match='address'):
+        decode_typed({'name': 'ann', 'address': {'city': 5}}, Person)
+
+
+def test_load_typed_with_path_leaves_the_document_alone(tmp_path):
+    path = write_json(tmp_path / 'people.json', {'people': [
+        {'name': 'ann', 'address': {'city': 'Oslo'}}]})
+    processor = JSONProcessor(path)
+
+    assert processor.load_typed(Person, 'people.*') == [Person('ann', Address('Oslo'))]
+    assert processor.data is None
+
+
+class Tag(TypedDict):
+    name: str
+    weight: NotRequired[float]
+    children: NotRequired[List['Tag']]
+
+
+def test_decode_typed_supports_typeddicts():
+    assert decode_typed({'name': 'a', 'weight': 1, 'extra': True, 'children': [{'name': 'b'}]}, Tag) == \
+        {'name': 'a', 'weight': 1.0, 'children': [{'name': 'b'}]}
+    with pytest.raises(SchemaError, match='missing required field'):
+        decode_typed({'weight': 1.0}, Tag)
+
+
+@pytest.mark.parametrize('text, schema, expected', [
+    ('[{"name": "a"}, {"name": "b", "weight": 2}]', List[Tag], [{'name': 'a'}, {'name': 'b', 'weight': 2.0}]),
+    ('{"x": {"city": "Oslo"}}', Dict[str, Address], {'x': Address('Oslo')}),
+    ('[]', list, []),
+    ('{"city": "Rome", "zip": "00100"}', Address, Address('Rome', '00100')),
+])
+def test_decode_typed_stream_matches_decode_typed(text, schema, expected):
+    assert decode_typed_stream(JSONStreamReader(io.StringIO(text), chunk_size=4), schema) == expected
+    assert decode_typed(json.loads(text), schema) == expected
+
+
+def test_decode_typed_stream_reports_the_failing_element():
+    with pytest.raises(SchemaError, match=r'\$\.1\.city'):
+        decode_typed_stream(JSONStreamReader(io.StringIO('[{"city": "Oslo"}, {"city": 5}]')), List[Address])
+
+
+def test_load_typed_streams_without_msgspec(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_processor, 'msgspec', None)
+    path = write_json(tmp_path / 'people.json', [{'name': 'ann', 'address': {'city': 'Oslo'}}])
+    processor = JSONProcessor(path)
+
+    assert processor.load_typed(List[Person]) == [Person('ann', Address('Oslo'))]
+    assert processor.load_typed(List[Address]) is None
@@ -0,0 +1,297 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from web_scraper import (CrawlFrontier, ExtractionSpec, Field, HTTPCache, ResultSink, WebScraper,
+                         normalize_url, open_sink, selector_tag)
+
+
+def make_handler(pages=5, cache_control=None, etag=None):
+    class PageHandler(BaseHTTPRequestHandler):
+        hits = Counter()
+        conditional = Counter()
+        lock = threading.Lock()
+
+        def do_GET(self):
+            with self.lock:
+                self.hits[self.path] += 1
+            if not self.path.startswith('/site/page/'):
+                self.send_error(404)
+                return
+            page = int(self.path.rstrip('/').rsplit('/', 1)[-1])
+            if etag and self.headers.get('If-None-Match') == etag:
+                with self.lock:
+                    self.conditional[self.path] += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            link = f"<li class='next'><a href='{page + 1}'>next</a></li>" if page < pages else ''
+            body = (f"<html><body><div class='quote'><span class='text'>Quote {page}</span>"
+                    f"<small class='author'>Author {page}</small>"
+                    f"<div class='tags'><a class='tag'>t{page}</a><a class='tag'>x</a></div></div>"
+                    f"<ul>{link}</ul></body></html>").encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if cache_control:
+                self.send_header('Cache-Control', cache_control)
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PageHandler
+
+
+QUOTES = ExtractionSpec({
+    'text': 'span.text',
+    'author': 'small.author',
+    'tags': Field('div.tags a.tag', many=True),
+}, item='div.quote')
+
+
+def quote_texts(soup):
+    return [span.get_text() for span in soup.select('span.text')]
+
+
+def test_scrape_concurrent_matches_sequential(serve):
+    base_url = serve(make_handler())
+    scraper = WebScraper(base_url, delay=0)
+    urls = [f"{base_url}/site/page/{page}" for page in range(1, 6)]
+
+    assert scraper.scrape_concurrent(urls, quote_texts, concurrency=3) == \
+        scraper.scrape_multiple_pages(urls, quote_texts)
+
+
+def test_scrape_concurrent_skips_failed_pages(serve):
+    base_url = serve(make_handler())
+    scraper = WebScraper(base_url, delay=0)
+    urls = [f"{base_url}/site/page/1", f"{base_url}/missing", f"{base_url}/site/page/2"]
+
+    assert scraper.scrape_concurrent(urls, quote_texts) == ['Quote 1', 'Quote 2']
+
+
+def test_token_bucket_spaces_requests_to_one_host(serve):
+    base_url = serve(make_handler())
+    scraper = WebScraper(base_url, delay=0.05)
+    urls = [f"{base_url}/site/page/{page}" for page in range(1, 5)]
+
+    started = time.monotonic()
+    scraper.scrape_concurrent(urls, quote_texts, concurrency=4)
+    # One token up front, then one every 50 ms for the remaining three requests.
+    assert time.monotonic() - started >= 0.14
+
+
+def test_scrape_pipelined_keeps_page_order(serve):
+    base_url = serve(make_handler())
+    scraper = WebScraper(base_url, delay=0)
+    urls = [f"{base_url}/site/page/{page}" for page in range(1, 6)]
+
+    records = scraper.scrape_pipelined(urls, QUOTES, concurrency=3, workers=2)
+
+    assert [record['text'] for record in records] == [f"Quote {page}" for page in range(1, 6)]
+    assert records[0] == {'text': 'Quote 1', 'author': 'Author 1', 'tags': ['t1', 'x']}
+
+
+def test_scrape_pipelined_writes_to_sink(serve, tmp_path):
+    base_url = serve(make_handler())
+    scraper = WebScraper(base_url, delay=0)
+    urls = [f"{base_url}/site/page/{page}" for page in range(1, 4)]
+    path = tmp_path / 'quotes.ndjson'
+
+    with open_sink(str(path)) as sink:
+        assert scraper.scrape_pipelined(urls, ('text', 'span.text'), workers=1, sink=sink) == []
+
+    assert path.read_text(encoding='utf-8').splitlines() == ['"Quote 1"', '"Quote 2"', '"Quote 3"']
+
+
+def test_scrape_pipelined_resolves_links_against_each_page(serve):
+    base_url = serve(make_handler(pages=3))
+    scraper = WebScraper(base_url, delay=0)
+    urls = [f"{base_url}/site/page/{page}" for page in range(1, 3)]
+
+    links = scraper.scrape_pipelined(urls, ('links', 'li.next > a'), workers=1)
+
+    assert [link['url'] for link in links] == [f"{base_url}/site/page/2", f"{base_url}/site/page/3"]
+
+
+def test_result_sink_is_abstract(tmp_path):
+    path = tmp_path / 'out.txt'
+
+    with pytest.raises(TypeError):
+        ResultSink(str(path))
+    assert not path.exists()
+
+
+def test_streaming_spec_matches_tree_spec():
+    html = ("<div class='quote'><span class='text'>A</span><small class='author'>B</small>"
+            "<div class='tags'><a class='tag'>c</a></div></div>")
+    streaming = ExtractionSpec(QUOTES.fields, item='div.quote', streaming=True)
+
+    assert streaming.extract(html) == QUOTES.extract(html)
+
+
+@pytest.mark.parametrize('selector, tag', [
+    ('div.quote', 'div'),
+    ('div > a', 'a'),
+    ('h1+p', 'p'),
+    ('h1 ~ span.text', 'span'),
+    ('.text', None),
+    ('a, span', None),
+    ('li:nth-child(2n+1)', None),
+])
+def test_selector_tag(selector, tag):
+    assert selector_tag(selector) == tag
+
+
+def test_cache_serves_fresh_pages_without_network(serve, tmp_path):
+    handler = make_handler(cache_control='max-age=60')
+    base_url = serve(handler)
+    scraper = WebScraper(base_url, delay=0, cache_dir=str(tmp_path / 'cache'))
+    url = f"{base_url}/site/page/1"
+
+    first = scraper.fetch(url)
+    second = scraper.fetch(url)
+
+    assert first.network and not first.not_modified
+    assert second.content == first.content and not second.network
+    assert handler.hits[url[len(base_url):]] == 1
+    assert scraper.cache.stats()['hits'] == 1
+
+
+def test_cache_revalidates_stale_pages(serve, tmp_path):
+    handler = make_handler(cache_control='no-cache', etag='"v1"')
+    base_url = serve(handler)
+    scraper = WebScraper(base_url, delay=0, cache_dir=str(tmp_path / 'cache'))
+    url = f"{base_url}/site/page/2"
+
+    first = scraper.fetch(url)
+    second = scraper.fetch(url)
+
+    assert second.content == first.content
+    assert second.not_modified and second.network
+    assert handler.conditional['/site/page/2'] == 1
+    assert scraper.cache.stats()['revalidated'] == 1
+
+
+def test_async_fetch_uses_cache(serve, tmp_path):
+    handler = make_handler(cache_control='max-age=60')
+    base_url = serve(handler)
+    scraper = WebScraper(base_url, delay=0, cache_dir=str(tmp_path / 'cache'))
+    urls = [f"{base_url}/site/page/{page}" for page in range(1, 4)]
+
+    scraper.scrape_concurrent(urls, quote_texts)
+    assert scraper.scrape_concurrent(urls, quote_texts) == ['Quote 1', 'Quote 2', 'Quote 3']
+    assert all(handler.hits[f"/site/page/{page}"] == 1 for page in range(1, 4))
+    assert scraper.cache.stats()['hits'] == 3 and scraper.cache.stats()['misses'] == 3
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = HTTPCache(str(tmp_path / 'cache'), max_bytes=250)
+    for name in ('a', 'b', 'c'):
+        cache.store(name, b'x' * 100, {'Cache-Control': 'max-age=60'})
+        time.sleep(0.01)
+
+    assert cache.lookup('a') is None
+    assert cache.lookup('b') is not None and cache.lookup('c') is not None
+    assert cache.stats()['bytes'] == 200
+    assert cache.stats()['evictions'] == 1
+
+    cache.store('b', b'x' * 50, {'Cache-Control': 'max-age=60'})
+    cache.discard('c')
+    assert cache.stats()['bytes'] == 50
+    cache.close()
+
+    reopened = HTTPCache(str(tmp_path / 'cache'), max_bytes=250)
+    assert reopened.stats()['bytes'] == 50
+    reopened.close()
+
+
+def test_cache_skips_no_store_responses(tmp_path):
+    cache = HTTPCache(str(tmp_path / 'cache'))
+    cache.store('a', b'body', {'Cache-Control': 'no-store'})
+
+    assert cache.lookup('a') is None
+    cache.close()
+
+
+def test_normalize_url():
+    assert normalize_url('HTTP://Example.com:80/a?b=2&a=1#frag') == 'http://example.com/a?a=1&b=2'
+    assert normalize_url('https://example.com') == 'https://example.com/'
+
+
+def test_frontier_deduplicates_and_respects_depth(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / 'frontier.db'), max_depth=1,
+                             allowed_hosts=['example.com'])
+    frontier.add('http://example.com/')
+
+    assert frontier.pop() == ('http://example.com/', 0)
+    added = frontier.complete('http://example.com/', [
+        'http://example.com/a', 'http://EXAMPLE.com/a', 'http://other.com/b'], depth=0)
+    assert added == 1
+    assert frontier.pop() == ('http://example.com/a', 1)
+    assert frontier.complete('http://example.com/a', ['http://example.com/deep'], depth=1) == 0
+    assert frontier.pop() is None
+    assert frontier.counts() == {'done': 2}
+    frontier.close()
+
+
+def test_frontier_requeues_in_progress_pages(tmp_path):
+    path = str(tmp_path / 'frontier.db')
+    frontier = CrawlFrontier(path)
+    frontier.add_many(['http://example.com/1', 'http://example.com/2'])
+    assert frontier.pop() == ('http://example.com/1', 0)
+    frontier.close()
+
+    resumed = CrawlFrontier(path)
+    assert len(resumed) == 2
+    resumed.close()
+
+
+def test_crawl_follows_relative_links_from_each_page(serve, tmp_path):
+    handler = make_handler(pages=4)
+    base_url = serve(handler)
+    scraper = WebScraper(base_url, delay=0)
+
+    quotes = scraper.crawl([f"{base_url}/site/page/1"], quote_texts, link_selector='li.next > a',
+                           frontier_path=str(tmp_path / 'frontier.db'))
+
+    assert quotes == ['Quote 1', 'Quote 2', 'Quote 3', 'Quote 4']
+
+
+def test_crawl_resumes_where_it_stopped(serve, tmp_path):
+    base_url = serve(make_handler(pages=4))
+    scraper = WebScraper(base_url, delay=0)
+    path = str(tmp_path / 'frontier.db')
+    seeds = [f"{base_url}/site/page/1"]
+
+    first = scraper.crawl(seeds, quote_texts, link_selector='li.next > a', frontier_path=path, max_pages=2)
+    rest = scraper.crawl(seeds, quote_texts, link_selector='li.next > a', frontier_path=path)
+
+    assert first == ['Quote 1', 'Quote 2']
+    assert rest == ['Quote 3', 'Quote 4']
+
+
+def test_crawl_into_append_sink_keeps_pages_from_before_a_restart(serve, tmp_path):
+    base_url = serve(make_handler(pages=4))
+    scraper = WebScraper(base_url, delay=0)
+    frontier_path = str(tmp_path / 'frontier.db')
+    sink_path = str(tmp_path / 'quotes.ndjson')
+    seeds = [f"{base_url}/site/page/1"]
+
+    with open_sink(sink_path, append=True) as sink:
+        scraper.crawl(seeds, quote_texts, link_selector='li.next > a', frontier_path=frontier_path,
+                      max_pages=2, sink=sink)
+    with open_sink(sink_path, append=True) as sink:
+        scraper.crawl(seeds, quote_texts, link_selector='li.next > a', frontier_path=frontier_path, sink=sink)
+
+    with open(sink_path, encoding='utf-8') as file:
+        assert [json.loads(line) for line in file] == ['Quote 1', 'Quote 2', 'Quote 3', 'Quote 4']
@@ -1,36 +1,770 @@
 import requests
-from bs4 import BeautifulSoup
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+import asyncio
 import csv
-import json
+import importlib.util
+import re
+import sqlite3
+import threading
 import time
-from urllib.parse import urljoin, urlparse
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
 import os
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from json_codec import codec
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class AsyncFetcher:
+    def __init__(self, scraper: 'WebScraper', concurrency: int = 10, burst: float = 1.0):
+        self.scraper = scraper
+        self.concurrency = concurrency
+        self.burst = burst
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.client = None
+
+    async def __aenter__(self) -> 'AsyncFetcher':
+        if aiohttp is not None:
+            self.client = aiohttp.ClientSession(headers=dict(self.scraper.session.headers),
+                                                connector=aiohttp.TCPConnector(limit=self.concurrency))
+        else:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=self.concurrency,
+                                                    pool_maxsize=self.concurrency)
+            self.scraper.session.mount('http://', adapter)
+            self.scraper.session.mount('https://', adapter)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.client is not None:
+            await self.client.close()
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            rate = 1 / self.scraper.delay if self.scraper.delay > 0 else 0
+            self.buckets[host] = TokenBucket(rate, self.burst)
+        return self.buckets[host]
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        await self._bucket(url).acquire()
+        async with self.semaphore:
+            if self.client is not None:
+                result = await self._fetch_aiohttp(url)
+            else:
+                result = await asyncio.to_thread(self.scraper.fetch, url)
+        return result.content if result is not None else None
+
+    async def _fetch_aiohttp(self, url: str) -> Optional['FetchResult']:
+        # Same cache and error semantics as WebScraper.fetch, only the transport differs.
+        cache = self.scraper.cache
+        try:
+            entry, headers = None, {}
+            if cache is not None:
+                cached, entry, headers = self.scraper._cache_lookup(url)
+                if cached is not None:
+                    return cached
+            async with self.client.get(url, headers=headers) as response:
+                if response.status == 304 and entry is not None:
+                    content = b''
+                else:
+                    response.raise_for_status()
+                    content = await response.read()
+                if cache is None:
+                    return FetchResult(content, False, True)
+                return self.scraper._cache_response(url, entry, response.status, response.headers, content)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+
+
+FetchResult = namedtuple('FetchResult', ['content', 'not_modified', 'network'])
+
+
+def cache_expiry(headers, now: float) -> Optional[float]:
+    directives = {}
+    for part in headers.get('Cache-Control', '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"')
+
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return now
+    if 'max-age' in directives:
+        try:
+            return now + int(directives['max-age'])
+        except ValueError:
+            return now
+    if headers.get('Expires'):
+        try:
+            return parsedate_to_datetime(headers['Expires']).timestamp()
+        except (TypeError, ValueError):
+            return now
+    return now
+
+
+class HTTPCache:
+    def __init__(self, cache_dir: str = '.http_cache', max_bytes: int = 100 * 1024 * 1024):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'cache.db'), check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)')
+        self.conn.commit()
+        # Running byte total so stores don't have to SUM the whole table.
+        self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT body, etag, last_modified, expires_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('body', 'etag', 'last_modified', 'expires_at'), row))
+
+    def touch(self, url: str, expires_at: Optional[float] = None):
+        # Touching without a new expiry serves a fresh entry; with one it records a 304 revalidation.
+        with self.lock:
+            if expires_at is None:
+                self.hits += 1
+                self.conn.execute('UPDATE responses SET last_access = ? WHERE url = ?', (time.time(), url))
+            else:
+                self.revalidated += 1
+                self.conn.execute('UPDATE responses SET last_access = ?, expires_at = ? WHERE url = ?',
+                                  (time.time(), expires_at, url))
+            self.conn.commit()
+
+    def store(self, url: str, content: bytes, headers):
+        now = time.time()
+        expires_at = cache_expiry(headers, now)
+        with self.lock:
+            self.misses += 1
+            self._remove(url)
+            if expires_at is None or len(content) > self.max_bytes:
+                self.conn.commit()
+                return
+            self.conn.execute(
+                'INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, content, headers.get('ETag'), headers.get('Last-Modified'),
+                 expires_at, len(content), now)
+            )
+            self.total_bytes += len(content)
+            self._evict()
+            self.conn.commit()
+
+    def discard(self, url: str):
+        with self.lock:
+            self._remove(url)
+            self.conn.commit()
+
+    def _remove(self, url: str):
+        row = self.conn.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+        if row is not None:
+            self.conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self.total_bytes -= row[0]
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            oldest = self.conn.execute(
+                'SELECT url, size FROM responses ORDER BY last_access LIMIT 32'
+            ).fetchall()
+            if not oldest:
+                break
+            for url, size in oldest:
+                self.conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+                self.evictions += 1
+                self.total_bytes -= size
+                if self.total_bytes <= self.max_bytes:
+                    break
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            entries = self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            size = self.total_bytes
+            hits, revalidated, misses, evictions = self.hits, self.revalidated, self.misses, self.evictions
+        requests_seen = hits + revalidated + misses
+        return {
+            'hits': hits,
+            'revalidated': revalidated,
+            'misses': misses,
+            'evictions': evictions,
+            'hit_rate': (hits + revalidated) / requests_seen if requests_seen else 0.0,
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    parts = urlparse(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, parts.path or '/', parts.params, query, ''))
+
+
+class CrawlFrontier:
+    def __init__(self, path: str = 'frontier.db', max_depth: Optional[int] = None,
+                 allowed_hosts: Optional[List[str]] = None):
+        self.max_depth = max_depth
+        self.allowed_hosts = set(allowed_hosts) if allowed_hosts else None
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontier (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                depth INTEGER NOT NULL,
+                priority INTEGER NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                parent TEXT
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS frontier_next ON frontier (state, priority DESC, seq)')
+        # Pages that were in flight when a previous run died are crawled again.
+        self.conn.execute("UPDATE frontier SET state = 'pending' WHERE state = 'in_progress'")
+        self.conn.commit()
+
+    def _insert(self, url: str, depth: int, priority: Optional[int], parent: Optional[str]) -> bool:
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        url = normalize_url(url)
+        if self.allowed_hosts is not None and urlparse(url).netloc not in self.allowed_hosts:
+            return False
+        cursor = self.conn.execute(
+            'INSERT OR IGNORE INTO frontier (url, depth, priority, parent) VALUES (?, ?, ?, ?)',
+            (url, depth, -depth if priority is None else priority, parent)
+        )
+        return cursor.rowcount == 1
+
+    def add(self, url: str, depth: int = 0, priority: Optional[int] = None,
+            parent: Optional[str] = None) -> bool:
+        added = self._insert(url, depth, priority, parent)
+        self.conn.commit()
+        return added
+
+    def add_many(self, urls: List[str], depth: int = 0, priority: Optional[int] = None,
+                 parent: Optional[str] = None) -> int:
+        added = sum(self._insert(url, depth, priority, parent) for url in urls)
+        self.conn.commit()
+        return added
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        row = self.conn.execute(
+            "SELECT seq, url, depth FROM frontier WHERE state = 'pending' "
+            "ORDER BY priority DESC, seq LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute("UPDATE frontier SET state = 'in_progress' WHERE seq = ?", (row[0],))
+        self.conn.commit()
+        return row[1], row[2]
+
+    def complete(self, url: str, links: Optional[List[str]] = None, depth: int = 0,
+                 priority: Optional[int] = None) -> int:
+        added = 0
+        with self.conn:
+            for link in links or []:
+                added += self._insert(link, depth + 1, priority, url)
+            self.conn.execute("UPDATE frontier SET state = 'done' WHERE url = ?", (normalize_url(url),))
+        return added
+
+    def fail(self, url: str):
+        with self.conn:
+            self.conn.execute("UPDATE frontier SET state = 'failed' WHERE url = ?", (normalize_url(url),))
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.conn.execute('SELECT state, COUNT(*) FROM frontier GROUP BY state').fetchall())
+
+    def __len__(self) -> int:
+        return self.counts().get('pending', 0)
+
+    def close(self):
+        self.conn.close()
+
+
+FSYNC_POLICIES = ('never', 'flush', 'close')
+
+
+class ResultSink(ABC):
+    def __init__(self, filename: str, flush_every: int = 100, fsync: str = 'close',
+                 append: bool = False):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+        self.filename = filename
+        self.flush_every = flush_every
+        self.fsync = fsync
+        self.count = 0
+        self.buffer = []
+        self.resumed = append and os.path.exists(filename) and os.path.getsize(filename) > 0
+        self.file = open(filename, 'a' if append else 'w', newline='', encoding='utf-8')
+
+    def write(self, record: Any):
+        self.buffer.append(record)
+        self.count += 1
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    @abstractmethod
+    def _write_batch(self, records: list):
+        pass
+
+    def _finish(self):
+        pass
+
+    def flush(self):
+        if self.buffer:
+            self._write_batch(self.buffer)
+            self.buffer = []
+        self.file.flush()
+        if self.fsync == 'flush':
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self._finish()
+        self.file.flush()
+        if self.fsync != 'never':
+            os.fsync(self.file.fileno())
+        self.file.close()
+        print(f"Data saved to {self.filename} ({self.count} records)")
+
+    def __enter__(self) -> 'ResultSink':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CSVSink(ResultSink):
+    def __init__(self, filename: str, fieldnames: Optional[List[str]] = None, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.fieldnames = fieldnames
+        self.writer = None
+
+    def _write_batch(self, records: list):
+        if self.writer is None:
+            if isinstance(records[0], dict):
+                self.fieldnames = self.fieldnames or list(records[0].keys())
+                self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames)
+                if not self.resumed:
+                    self.writer.writeheader()
+            else:
+                self.writer = csv.writer(self.file)
+        self.writer.writerows(records)
+
+
+class NDJSONSink(ResultSink):
+    def _write_batch(self, records: list):
+        self.file.write(''.join(codec.dumps(record) + '\n' for record in records))
+
+
+class JSONArraySink(ResultSink):
+    def __init__(self, filename: str, **kwargs):
+        if kwargs.get('append'):
+            raise ValueError("JSON array files cannot be appended to; use an NDJSON sink to resume")
+        super().__init__(filename, **kwargs)
+        self.file.write('[')
+        self.written = 0
+
+    def _write_batch(self, records: list):
+        prefix = ',\n' if self.written else '\n'
+        self.file.write(prefix + ',\n'.join(codec.dumps(record) for record in records))
+        self.written += len(records)
+
+    def _finish(self):
+        self.file.write('\n]\n' if self.written else ']\n')
+
+
+SINKS = {
+    '.csv': CSVSink,
+    '.ndjson': NDJSONSink,
+    '.jsonl': NDJSONSink,
+    '.json': JSONArraySink,
+}
+
+
+def open_sink(filename: str, **kwargs) -> ResultSink:
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"No sink for {extension or filename}; expected one of {', '.join(SINKS)}")
+    return SINKS[extension](filename, **kwargs)
+
+
+POST_PROCESSORS = {
+    'strip': str.strip,
+    'lower': str.lower,
+    'int': int,
+    'float': float,
+}
+
+
+class Field:
+    def __init__(self, selector: str, attr: Optional[str] = None, many: bool = False,
+                 post: Union[str, Callable, None] = None):
+        self.selector = selector
+        self.attr = attr
+        self.many = many
+        self.post = POST_PROCESSORS[post] if isinstance(post, str) else post
+
+    def value(self, element: Tag) -> Optional[str]:
+        if self.attr:
+            return element.get(self.attr)
+        return element.get_text(strip=True)
+
+    def finish(self, values: list) -> Any:
+        if self.post is not None:
+            values = [self.post(value) for value in values if value is not None]
+        if self.many:
+            return values
+        return values[0] if values else None
+
+
+SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)$')
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                 'source', 'track', 'wbr'}
+
+
+def compile_simple_selector(selector: str) -> list:
+    steps = []
+    combinator = ' '
+    for token in selector.replace('>', ' > ').split():
+        if token == '>':
+            combinator = '>'
+            continue
+        match = SIMPLE_SELECTOR.match(token)
+        if not match:
+            raise ValueError(f"Selector {selector!r} is too complex for the streaming tokenizer")
+        name = match.group(1).lower() if match.group(1) else None
+        parts = re.findall(r'([.#])([\w-]+)', match.group(2))
+        classes = {value for kind, value in parts if kind == '.'}
+        ids = {value for kind, value in parts if kind == '#'}
+        steps.append((combinator, name, classes, ids))
+        combinator = ' '
+    if not steps:
+        raise ValueError("Empty selector")
+    return steps
+
+
+def selector_tag(selector: str) -> Optional[str]:
+    # Tag name the selector's subject must have, used to skip nodes that cannot match.
+    if ',' in selector:
+        return None
+    # Split on every combinator; a '+' or '~' inside brackets or parentheses only makes
+    # the last part start without a tag name, which falls back to None.
+    parts = re.split(r'[\s>+~]+', selector.strip())
+    match = re.match(r'([a-zA-Z][\w-]*)', parts[-1])
+    return match.group(1).lower() if match else None
+
+
+def _matches_step(step: tuple, element: tuple) -> bool:
+    _, name, classes, ids = step
+    tag, element_classes, element_id = element
+    return ((name is None or name == tag) and classes <= element_classes
+            and (not ids or element_id in ids))
+
+
+def matches_simple_selector(steps: list, stack: list) -> bool:
+    # stack holds (tag, classes, id) for every open element, innermost last.
+    if not stack or not _matches_step(steps[-1], stack[-1]):
+        return False
+    position = len(stack) - 1
+    for index in range(len(steps) - 2, -1, -1):
+        combinator = steps[index + 1][0]
+        if combinator == '>':
+            position -= 1
+            if position < 0 or not _matches_step(steps[index], stack[position]):
+                return False
+            continue
+        position -= 1
+        while position >= 0 and not _matches_step(steps[index], stack[position]):
+            position -= 1
+        if position < 0:
+            return False
+    return True
+
+
+class _SpecTokenizer(HTMLParser):
+    def __init__(self, spec: 'ExtractionSpec'):
+        super().__init__()
+        self.spec = spec
+        self.stack = []
+        self.open = []
+        self.records = []
+        self.items = []
+        if spec.item is None:
+            self.items.append(self._new_record(None))
+
+    def _new_record(self, depth: Optional[int]) -> dict:
+        record = {name: [] for name in self.spec.fields}
+        self.records.append(record)
+        return {'depth': depth, 'values': record}
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        element = (tag, set((attributes.get('class') or '').split()), attributes.get('id'))
+        self.stack.append(element)
+        depth = len(self.stack)
+
+        if self.spec.item is not None and matches_simple_selector(self.spec.item_steps, self.stack):
+            self.items.append(self._new_record(depth))
+        elif self.items:
+            values = self.items[-1]['values']
+            for name, field in self.spec.fields.items():
+                if not matches_simple_selector(self.spec.field_steps[name], self.stack):
+                    continue
+                if field.attr:
+                    values[name].append(attributes.get(field.attr))
+                else:
+                    values[name].append(None)
+                    self.open.append((depth, values[name], len(values[name]) - 1, []))
+
+        if tag in VOID_ELEMENTS:
+            self._close(depth)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self._close(len(self.stack))
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack), 0, -1):
+            if self.stack[depth - 1][0] == tag:
+                self._close(depth)
+                return
+
+    def handle_data(self, data):
+        text = data.strip()
+        if text:
+            for capture in self.open:
+                capture[3].append(text)
+
+    def _close(self, depth: int):
+        # Closes the element at depth along with anything left unclosed inside it.
+        while self.open and self.open[-1][0] >= depth:
+            _, values, index, pieces = self.open.pop()
+            values[index] = ''.join(pieces)
+        while self.items and self.items[-1]['depth'] is not None and self.items[-1]['depth'] >= depth:
+            self.items.pop()
+        del self.stack[depth - 1:]
+
+
+class ExtractionSpec:
+    def __init__(self, fields: Dict[str, Union[str, Field]], item: Optional[str] = None,
+                 streaming: bool = False):
+        self.fields = {name: field if isinstance(field, Field) else Field(field)
+                       for name, field in fields.items()}
+        self.item = item
+        self.streaming = streaming
+        self.item_matcher = soupsieve.compile(item) if item else None
+        self.item_tag = selector_tag(item) if item else None
+        self.field_matchers = {}
+        for name, field in self.fields.items():
+            matcher = (name, soupsieve.compile(field.selector))
+            self.field_matchers.setdefault(selector_tag(field.selector), []).append(matcher)
+        if streaming:
+            self.item_steps = compile_simple_selector(item) if item else None
+            self.field_steps = {name: compile_simple_selector(field.selector)
+                                for name, field in self.fields.items()}
+
+    def _finish(self, records: list) -> list:
+        return [{name: field.finish(record[name]) for name, field in self.fields.items()}
+                for record in records]
+
+    def extract(self, page: Union[BeautifulSoup, bytes, str], parser: str = 'html.parser') -> list:
+        if not isinstance(page, Tag):
+            if self.streaming:
+                return self.extract_stream(page)
+            page = BeautifulSoup(page, parser)
+
+        records = []
+        record = None
+        if self.item_matcher is None:
+            record = {name: [] for name in self.fields}
+            records.append(record)
+        stack = [(child, record) for child in reversed(page.contents) if isinstance(child, Tag)]
+        while stack:
+            node, record = stack.pop()
+            if (self.item_matcher is not None and self.item_tag in (None, node.name)
+                    and self.item_matcher.match(node)):
+                record = {name: [] for name in self.fields}
+                records.append(record)
+            elif record is not None:
+                candidates = self.field_matchers.get(node.name, []) + self.field_matchers.get(None, [])
+                for name, matcher in candidates:
+                    if matcher.match(node):
+                        record[name].append(self.fields[name].value(node))
+            stack.extend((child, record) for child in reversed(node.contents) if isinstance(child, Tag))
+        return self._finish(records)
+
+    def extract_stream(self, content: Union[bytes, str], encoding: str = 'utf-8') -> list:
+        if not self.streaming:
+            raise ValueError("This spec was not compiled for streaming; pass streaming=True")
+        tokenizer = _SpecTokenizer(self)
+        tokenizer.feed(content.decode(encoding, 'replace') if isinstance(content, bytes) else content)
+        tokenizer.close()
+        return self._finish(tokenizer.records)
+
+
+EXTRACTORS = {'links': 'scrape_links', 'text': 'scrape_text', 'table': 'scrape_table'}
+
+_worker_scrapers: Dict[str, 'WebScraper'] = {}
+
+
+def resolve_parser(parser: str) -> str:
+    # 'auto' is opt-in: lxml is faster but repairs malformed markup differently from
+    # html.parser, so selectors written against the default can match other nodes.
+    if parser == 'auto':
+        return 'lxml' if importlib.util.find_spec('lxml') is not None else 'html.parser'
+    return parser
+
+
+def _extract_page(content: bytes, url: str, base_url: str, parser: str,
+                  extractor: Union[Tuple[str, str], Callable, ExtractionSpec]) -> list:
+    if isinstance(extractor, ExtractionSpec):
+        return extractor.extract(content, parser)
+    soup = BeautifulSoup(content, parser)
+    if callable(extractor):
+        return extractor(soup)
+    kind, selector = extractor
+    if base_url not in _worker_scrapers:
+        _worker_scrapers[base_url] = WebScraper(base_url, parser=parser)
+    scraper = _worker_scrapers[base_url]
+    if kind == 'links':
+        return scraper.scrape_links(soup, selector, page_url=url)
+    return getattr(scraper, EXTRACTORS[kind])(soup, selector)
 
 
 class WebScraper:
-    def __init__(self, base_url: str, delay: float = 1.0):
+    def __init__(self, base_url: str, delay: float = 1.0, parser: str = 'html.parser',
+                 cache_dir: Optional[str] = None, cache_max_bytes: int = 100 * 1024 * 1024):
         self.base_url = base_url
         self.delay = delay
+        self.parser = resolve_parser(parser)
+        self.cache = HTTPCache(cache_dir, cache_max_bytes) if cache_dir else None
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
 
-    def get_page(self, url: str) -> BeautifulSoup:
+    def fetch(self, url: str) -> Optional[FetchResult]:
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            if self.cache is None:
+                response = self.session.get(url)
+                response.raise_for_status()
+                return FetchResult(response.content, False, True)
+
+            cached, entry, headers = self._cache_lookup(url)
+            if cached is not None:
+                return cached
+            response = self.session.get(url, headers=headers)
+            if response.status_code != 304 or entry is None:
+                response.raise_for_status()
+            return self._cache_response(url, entry, response.status_code, response.headers, response.content)
         except requests.RequestException as e:
             print(f"Error fetching {url}: {e}")
             return None
 
-    def scrape_links(self, soup: BeautifulSoup, css_selector: str) -> list:
+    def _cache_lookup(self, url: str) -> Tuple[Optional[FetchResult], Optional[Dict[str, Any]], Dict[str, str]]:
+        # Returns a fresh cached result, or the stale entry plus conditional request headers.
+        entry = self.cache.lookup(url)
+        if entry is not None and entry['expires_at'] > time.time():
+            self.cache.touch(url)
+            return FetchResult(entry['body'], True, False), entry, {}
+
+        headers = {}
+        if entry is not None and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry is not None and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return None, entry, headers
+
+    def _cache_response(self, url: str, entry: Optional[Dict[str, Any]], status: int,
+                        headers, content: bytes) -> FetchResult:
+        if status == 304 and entry is not None:
+            self.cache.touch(url, cache_expiry(headers, time.time()))
+            return FetchResult(entry['body'], True, True)
+
+        self.cache.store(url, content, headers)
+        return FetchResult(content, False, True)
+
+    def get_page(self, url: str) -> BeautifulSoup:
+        result = self.fetch(url)
+        if result is None:
+            return None
+        return BeautifulSoup(result.content, self.parser)
+
+    def scrape_links(self, soup: BeautifulSoup, css_selector: str, page_url: Optional[str] = None) -> list:
         links = []
         for link in soup.select(css_selector):
             href = link.get('href')
             if href:
-                full_url = urljoin(self.base_url, href)
+                full_url = urljoin(page_url or self.base_url, href)
                 links.append({
                     'text': link.get_text(strip=True),
                     'url': full_url
@@ -84,30 +818,170 @@ class WebScraper:
 
     def save_to_json(self, data: list, filename: str):
         with open(filename, 'w', encoding='utf-8') as jsonfile:
-            json.dump(data, jsonfile, indent=2, ensure_ascii=False)
+            codec.dump(data, jsonfile, indent=2)
         print(f"Data saved to {filename}")
 
-    def scrape_multiple_pages(self, page_urls: list, scrape_func):
+    async def scrape_multiple_pages_async(self, page_urls: list, scrape_func,
+                                          concurrency: int = 10, burst: float = 1.0) -> list:
+        async with AsyncFetcher(self, concurrency, burst) as fetcher:
+            async def scrape(url: str) -> list:
+                content = await fetcher.fetch(url)
+                if content is None:
+                    return []
+                print(f"Scraped: {url}")
+                return scrape_func(BeautifulSoup(content, self.parser))
+
+            results = await asyncio.gather(*(scrape(url) for url in page_urls))
+
+        all_data = []
+        for data in results:
+            all_data.extend(data)
+        return all_data
+
+    def scrape_concurrent(self, page_urls: list, scrape_func, concurrency: int = 10,
+                          burst: float = 1.0) -> list:
+        return asyncio.run(self.scrape_multiple_pages_async(page_urls, scrape_func, concurrency, burst))
+
+    async def iter_pipelined(self, page_urls: list,
+                             extractor: Union[Tuple[str, str], Callable, ExtractionSpec],
+                             concurrency: int = 10, workers: Optional[int] = None,
+                             max_pending: Optional[int] = None,
+                             ordered: bool = True) -> AsyncIterator[Tuple[str, list]]:
+        loop = asyncio.get_running_loop()
+        workers = workers or os.cpu_count() or 1
+        urls: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(page_urls):
+            urls.put_nowait(item)
+        fetched: asyncio.Queue = asyncio.Queue(maxsize=max_pending or 2 * workers)
+        results: asyncio.Queue = asyncio.Queue()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            async with AsyncFetcher(self, concurrency) as fetcher:
+                async def fetch_worker():
+                    while not urls.empty():
+                        index, url = urls.get_nowait()
+                        await fetched.put((index, url, await fetcher.fetch(url)))
+
+                async def parse_worker():
+                    while True:
+                        item = await fetched.get()
+                        if item is None:
+                            return
+                        index, url, content = item
+                        data = []
+                        if content is not None:
+                            try:
+                                data = await loop.run_in_executor(pool, _extract_page, content, url,
+                                                                  self.base_url, self.parser, extractor)
+                            except Exception as e:
+                                print(f"Error parsing {url}: {e}")
+                        await results.put((index, url, data))
+
+                fetchers = [asyncio.create_task(fetch_worker()) for _ in range(concurrency)]
+                parsers = [asyncio.create_task(parse_worker()) for _ in range(workers)]
+                try:
+                    buffered = {}
+                    next_index = 0
+                    for _ in range(len(page_urls)):
+                        index, url, data = await results.get()
+                        if not ordered:
+                            yield url, data
+                            continue
+                        buffered[index] = (url, data)
+                        while next_index in buffered:
+                            yield buffered.pop(next_index)
+                            next_index += 1
+                finally:
+                    for task in fetchers + parsers:
+                        task.cancel()
+                    await asyncio.gather(*fetchers, *parsers, return_exceptions=True)
+
+    def scrape_pipelined(self, page_urls: list,
+                         extractor: Union[Tuple[str, str], Callable, ExtractionSpec],
+                         concurrency: int = 10, workers: Optional[int] = None,
+                         max_pending: Optional[int] = None, ordered: bool = True,
+                         sink: Optional[ResultSink] = None) -> list:
+        async def collect() -> list:
+            all_data = []
+            async for url, data in self.iter_pipelined(page_urls, extractor, concurrency, workers,
+                                                       max_pending, ordered):
+                print(f"Scraped: {url}")
+                if sink is not None:
+                    sink.write_many(data)
+                else:
+                    all_data.extend(data)
+            return all_data
+
+        return asyncio.run(collect())
+
+    def crawl(self, seed_urls: list, scrape_func, link_selector: str = 'a',
+              frontier_path: str = 'frontier.db', max_depth: Optional[int] = None,
+              max_pages: Optional[int] = None, same_host: bool = True,
+              sink: Optional[ResultSink] = None) -> list:
+        allowed_hosts = [urlparse(normalize_url(url)).netloc for url in seed_urls] if same_host else None
+        frontier = CrawlFrontier(frontier_path, max_depth, allowed_hosts)
+        all_data = []
+        try:
+            frontier.add_many(seed_urls)
+            pages = 0
+            while max_pages is None or pages < max_pages:
+                item = frontier.pop()
+                if item is None:
+                    break
+                url, depth = item
+                print(f"Crawling (depth {depth}): {url}")
+                result = self.fetch(url)
+                if result is None:
+                    frontier.fail(url)
+                    time.sleep(self.delay)
+                    continue
+
+                soup = BeautifulSoup(result.content, self.parser)
+                data = scrape_func(soup)
+                if sink is not None:
+                    # Records reach the file before the page is marked done, so a resumed
+                    # crawl neither skips nor loses them.
+                    sink.write_many(data)
+                    sink.flush()
+                else:
+                    all_data.extend(data)
+                links = [link['url'] for link in self.scrape_links(soup, link_selector, url)]
+                frontier.complete(url, links, depth)
+                pages += 1
+                if result.network:
+                    time.sleep(self.delay)
+        finally:
+            frontier.close()
+        return all_data
+
+    def scrape_multiple_pages(self, page_urls: list, scrape_func, skip_unchanged: bool = False,
+                              sink: Optional[ResultSink] = None):
         all_data = []
         for url in page_urls:
             print(f"Scraping: {url}")
-            soup = self.get_page(url)
-            if soup:
-                data = scrape_func(soup)
-                all_data.extend(data)
-            time.sleep(self.delay)
+            result = self.fetch(url)
+            if result is not None and not (skip_unchanged and result.not_modified):
+                data = scrape_func(BeautifulSoup(result.content, self.parser))
+                if sink is not None:
+                    sink.write_many(data)
+                else:
+                    all_data.extend(data)
+            if result is None or result.network:
+                time.sleep(self.delay)
         return all_data
 
 
 def scrape_news_example():
-    scraper = WebScraper("https://news.ycombinator.com")
-
-    soup = scraper.get_page(scraper.base_url)
-    if not soup:
-        return
+    scraper = WebScraper("https://news.ycombinator.com", cache_dir='.http_cache')
 
+    # A rerun revalidates the cached front page; a 304 means the saved headlines are still current.
     print("Scraping Hacker News headlines...")
-    headlines = scraper.scrape_links(soup, 'span.titleline > a')
+    headlines = scraper.scrape_multiple_pages(
+        [scraper.base_url], lambda soup: scraper.scrape_links(soup, 'span.titleline > a'),
+        skip_unchanged=True)
+    if not headlines:
+        print("No new headlines, keeping hacker_news_headlines.json")
+        return
 
     for i, headline in enumerate(headlines[:10], 1):
         print(f"{i}. {headline['text']}")
@@ -117,42 +991,34 @@ def scrape_news_example():
     scraper.save_to_json(headlines, 'hacker_news_headlines.json')
 
 
-def scrape_quotes_example():
-    scraper = WebScraper("http://quotes.toscrape.com")
-
-    all_quotes = []
-    page = 1
-
-    while True:
-        url = f"{scraper.base_url}/page/{page}/"
-        print(f"Scraping page {page}: {url}")
-
-        soup = scraper.get_page(url)
-        if not soup or "No quotes found!" in soup.get_text():
-            break
+QUOTE_SPEC = ExtractionSpec({
+    'text': 'span.text',
+    'author': 'small.author',
+    'tags': Field('div.tags a.tag', many=True),
+}, item='div.quote', streaming=True)
 
-        quotes = []
-        quote_elements = soup.select('div.quote')
 
-        for quote_elem in quote_elements:
-            text = quote_elem.select_one('span.text').get_text(strip=True)
-            author = quote_elem.select_one('small.author').get_text(strip=True)
-            tags = [tag.get_text(strip=True)
-                    for tag in quote_elem.select('div.tags a.tag')]
-
-            quotes.append({
-                'text': text,
-                'author': author,
-                'tags': tags
-            })
+def scrape_quotes_example():
+    scraper = WebScraper("http://quotes.toscrape.com", cache_dir='.http_cache')
 
-        all_quotes.extend(quotes)
-        page += 1
-        time.sleep(scraper.delay)
+    # The frontier and the NDJSON sink both survive a crash, so a rerun resumes from the last
+    # finished page and keeps the quotes scraped before it. Both are removed once saved.
+    frontier_path = 'quotes_frontier.db'
+    partial_path = 'quotes_partial.ndjson'
+    with open_sink(partial_path, append=True) as sink:
+        scraper.crawl([f"{scraper.base_url}/page/1/"], QUOTE_SPEC.extract,
+                      link_selector='li.next > a', frontier_path=frontier_path, sink=sink)
 
-    scraper.save_to_json(all_quotes, 'quotes.json')
-    scraper.save_to_csv(all_quotes, 'quotes.csv')
-    print(f"Scraped {len(all_quotes)} quotes")
+    with open(partial_path, 'r', encoding='utf-8') as file:
+        all_quotes = [codec.loads(line) for line in file if line.strip()]
+    if all_quotes:
+        scraper.save_to_json(all_quotes, 'quotes.json')
+        scraper.save_to_csv(all_quotes, 'quotes.csv')
+        print(f"Scraped {len(all_quotes)} quotes")
+    else:
+        print("No quotes scraped")
+    os.remove(frontier_path)
+    os.remove(partial_path)
 
 
 def scrape_table_example():